@@ -0,0 +1,174 @@
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from protonmail_auto import artifacts
+from protonmail_auto import browser
+from protonmail_auto import logs
+from protonmail_auto.config import Config, ConfigError
+from protonmail_auto.context import set_current_test
+from protonmail_auto import health
+from protonmail_auto.instrumentation import recorder, report_path
+from protonmail_auto.namespace import worker_id
+from protonmail_auto.pages import set_base_url
+from protonmail_auto.pool import get_pool
+from protonmail_auto.profiling import history_path, profiler
+from protonmail_auto.scheduler import scheduler
+from protonmail_auto.standin import StandInServer
+from protonmail_auto.timeouts import policy
+from protonmail_auto.trace import tracer
+
+_standin = None
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('protonmail')
+    group.addoption('--standin', action='store_true',
+                    help='run tests against local stand-in server instead of beta.protonmail.com')
+    group.addoption('--standin-items', type=int, default=0, help='number of items generated in stand-in')
+    group.addoption('--standin-latency', type=float, default=0.0, help='seconds added to every stand-in request')
+    group.addoption('--config', action='append', default=[], metavar='NAME=VALUE',
+                    help='override Config setting, e.g. --config USERNAME=user --config POOL_SIZE=2')
+    group.addoption('--sweep', action='store_true',
+                    help='delete items left by previous test runs, in background on own browser')
+    group.addoption('--page-profile', action='store_true',
+                    help='collect ProtonMail page performance metrics and compare with previous runs')
+    group.addoption('--instrument', action='store_true',
+                    help='count and time WebDriver commands per test and page method')
+    group.addoption('--command-trace', action='store_true',
+                    help='write every WebDriver command with response and timing to data/traces')
+
+
+def pytest_configure(config):
+    for setting in config.option.config:
+        name, sep, value = setting.partition('=')
+        if not sep:
+            raise ConfigError(f'--config should be NAME=VALUE, got "{setting}"')
+        Config.override(**{name: value})
+    recorder.enabled = config.option.instrument
+    profiler.enabled = config.option.page_profile
+    tracer.enabled = config.option.command_trace
+    if config.option.collectonly:
+        return
+    logs.start()
+
+
+def _runs_tests(config):
+    """
+    :return: False for collect only and for pytest-xdist controller process, tests run in workers
+    """
+    if config.option.collectonly:
+        return False
+    return not (getattr(config.option, 'numprocesses', None) and not hasattr(config, 'workerinput'))
+
+
+def pytest_sessionstart(session):
+    """
+    Redact log capture of pytest. Start browsers of pool in background, they log in while tests are collected
+    """
+    global _standin
+    config = session.config
+    # warnings captured to test reports are redacted too
+    logging_plugin = config.pluginmanager.get_plugin('logging-plugin')
+    if logging_plugin:
+        for handler in (logging_plugin.report_handler, logging_plugin.caplog_handler):
+            handler.setFormatter(logs.RedactingFormatter(logging_plugin.formatter))
+    if not _runs_tests(config):
+        return
+    if config.option.standin:
+        _standin = StandInServer(items=config.option.standin_items, latency=config.option.standin_latency).start()
+        set_base_url(_standin.url)
+    get_pool().prewarm()
+
+
+def pytest_collection_finish(session):
+    """
+    Cancel start of browsers if no collected test needs browser, e.g. unit tests
+    """
+    if not _runs_tests(session.config):
+        return
+    if not any('driver' in getattr(item, 'fixturenames', ()) for item in session.items):
+        get_pool().cancel()
+
+
+def pytest_unconfigure(config):
+    browser.stop_service()
+    if _standin:
+        _standin.stop()
+    logs.stop()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(session, config, items):
+    """
+    Order tests by state dependencies, put each chain to own pytest-xdist group.
+    Runs before pytest-xdist adds group names to node ids
+    """
+    scheduler.modify_items(items, lambda item, chain: item.add_marker(pytest.mark.xdist_group(chain)))
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    # skip before fixtures, consumer of failed producer should not wait for browser and timeouts
+    reason = scheduler.skip_reason(item)
+    if reason:
+        pytest.skip(reason)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    # browser is restarted by driver fixture if test failed in WebDriver
+    yield
+    if call.when == 'call' and call.excinfo is not None and call.excinfo.errisinstance(WebDriverException):
+        item.webdriver_failed = True
+
+
+def pytest_runtest_logreport(report):
+    scheduler.record(report)
+
+
+def pytest_runtest_logstart(nodeid, location):
+    set_current_test(nodeid)
+
+
+def pytest_runtest_logfinish(nodeid, location):
+    set_current_test(None)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    artifacts.wait_all()
+    tracer.close()
+    policy.save()
+    if recorder.enabled and recorder.by_test():
+        recorder.save(report_path(worker_id()))
+    if profiler.enabled and profiler.samples:
+        session.config._page_regressions = profiler.save(history_path(worker_id()))
+    if health.monitor.events:
+        health.monitor.save(health.report_path(worker_id()))
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if browser.service_stats.sessions:
+        terminalreporter.write_line(browser.service_report())
+    regressions = getattr(config, '_page_regressions', None)
+    if regressions is not None:
+        terminalreporter.section('Page performance')
+        terminalreporter.write_line(f'History: {history_path(worker_id())}')
+        for regression in regressions:
+            terminalreporter.write_line(f'Regression: {regression}')
+        if not regressions:
+            terminalreporter.write_line('No regressions against previous runs')
+    if health.monitor.events:
+        terminalreporter.section('Browser health')
+        for line in health.monitor.summary_lines():
+            terminalreporter.write_line(line)
+        terminalreporter.write_line(f'Full report: {health.report_path(worker_id())}')
+    if tracer.paths():
+        terminalreporter.section('WebDriver command traces')
+        for path in tracer.paths():
+            terminalreporter.write_line(path)
+    # with pytest-xdist commands are recorded in workers, see their json reports
+    if recorder.enabled and recorder.by_test():
+        terminalreporter.section('WebDriver commands')
+        for line in recorder.summary_lines():
+            terminalreporter.write_line(line)
+        terminalreporter.write_line(f'Full report: {report_path(worker_id())}')
@@ -0,0 +1,238 @@
+"""
+Awaitable adapters of page objects for code running in asyncio event loop.
+Selenium client is blocking: each call is run in shared bounded thread pool
+(Config.ASYNC_WORKERS) and awaited, so event loop is not blocked, calls of one browser are serialized.
+It is not asynchronous I/O and not expected to be faster than thread per driver, a pool thread is busy
+while command runs. Throughput comparison with thread per driver:
+python -m protonmail_auto.aio --sessions 10 --items 5
+"""
+import sys
+import time
+import asyncio
+import logging
+import argparse
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import Config
+from .pages import LoginPage, SettingsFoldersPage, set_base_url
+from .pool import start_browser, _quit
+from .locators import ColorsLocators
+from .standin import StandInServer
+
+_executor = None
+
+
+def get_executor():
+    """
+    Thread pool of all async drivers of process, Config.ASYNC_WORKERS threads
+    :return: ThreadPoolExecutor
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=Config.ASYNC_WORKERS, thread_name_prefix='aio')
+    return _executor
+
+
+class AsyncDriver:
+    """
+    Awaitable WebDriver commands: await driver.get(url), await driver.execute_script(...).
+    Properties which send commands are awaitable too: await driver.title
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        # selenium session does not support concurrent commands
+        self.lock = asyncio.Lock()
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Call blocking func in thread pool, one call per browser at a time
+        :return: result of func
+        """
+        async with self.lock:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+    async def property(self, name):
+        """
+        Read property which sends command, e.g. await driver.property('title')
+        """
+        return await self.run(getattr, self.driver, name)
+
+    def __getattr__(self, name):
+        if isinstance(getattr(type(self.driver), name, None), property):
+            # reading property sends command, it should not block event loop or bypass lock
+            return self.property(name)
+        attr = getattr(self.driver, name)
+        if not callable(attr):
+            return attr
+
+        async def command(*args, **kwargs):
+            return await self.run(attr, *args, **kwargs)
+        return command
+
+
+def _awaitable(name):
+    """
+    Async method calling method of sync page object with same arguments
+    """
+
+    async def method(self, *args, **kwargs):
+        return await self.driver.run(getattr(self.page, name), *args, **kwargs)
+    method.__name__ = name
+    method.__doc__ = f'Awaitable {name}, see sync page object'
+    return method
+
+
+class AsyncPage:
+    PAGE = None
+
+    def __init__(self, driver):
+        """
+        :param driver: AsyncDriver or selenium.webdriver
+        """
+        self.driver = driver if isinstance(driver, AsyncDriver) else AsyncDriver(driver)
+        self.page = self.PAGE(self.driver.driver)
+
+
+class AsyncLoginPage(AsyncPage):
+    PAGE = LoginPage
+
+    login = _awaitable('login')
+    login_with_session = _awaitable('login_with_session')
+
+
+class AsyncSettingsFoldersPage(AsyncPage):
+    PAGE = SettingsFoldersPage
+
+    go_to_settings_page = _awaitable('go_to_settings_page')
+    get_notifications = _awaitable('get_notifications')
+    get_items_snapshot = _awaitable('get_items_snapshot')
+    find_item = _awaitable('find_item')
+    add_folder = _awaitable('add_folder')
+    add_label = _awaitable('add_label')
+    edit_item = _awaitable('edit_item')
+    delete_item = _awaitable('delete_item')
+    add_items = _awaitable('add_items')
+    edit_items = _awaitable('edit_items')
+    delete_items = _awaitable('delete_items')
+    close_modal_dialog = _awaitable('close_modal_dialog')
+    success_notification_appeared = _awaitable('success_notification_appeared')
+    item_is_displayed = _awaitable('item_is_displayed')
+    item_color_is_correct = _awaitable('item_color_is_correct')
+    verify_colors = _awaitable('verify_colors')
+
+
+async def start_async_browser():
+    """
+    Open browser, login, go to Settings Folder/Labels page, see pool.start_browser
+    :return: AsyncDriver
+    """
+    loop = asyncio.get_running_loop()
+    return AsyncDriver(await loop.run_in_executor(get_executor(), start_browser))
+
+
+
+def _scenario_items(session, count):
+    color = ColorsLocators.RGB_114_114_167
+    return [(f'aio_{session}_{i}', color, 'folder') for i in range(count)]
+
+
+def items_scenario(items):
+    """
+    Benchmark scenario: add and delete items with bulk page methods
+    :param items: items per driver
+    :return: tuple (sync scenario, async scenario), both called with session number and driver
+    """
+    def scenario(session, driver):
+        settings_page = SettingsFoldersPage(driver)
+        batch = _scenario_items(f't{session}', items)
+        settings_page.add_items(batch)
+        settings_page.delete_items([name for name, _, _ in batch])
+
+    async def async_scenario(session, driver):
+        settings_page = AsyncSettingsFoldersPage(driver)
+        batch = _scenario_items(f'a{session}', items)
+        await settings_page.add_items(batch)
+        await settings_page.delete_items([name for name, _, _ in batch])
+
+    return scenario, async_scenario
+
+
+def run_threads(drivers, scenario):
+    """
+    Run scenario with thread per driver
+    :param drivers: list of selenium.webdriver
+    :param scenario: callable(session number, driver)
+    :return: seconds
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(drivers)) as executor:
+        for future in [executor.submit(scenario, i, driver) for i, driver in enumerate(drivers)]:
+            future.result()
+    return time.perf_counter() - start
+
+
+async def run_async(drivers, scenario):
+    """
+    Run async scenario for all drivers in one event loop
+    :param drivers: list of AsyncDriver
+    :param scenario: coroutine function(session number, AsyncDriver)
+    :return: seconds
+    """
+    start = time.perf_counter()
+    await asyncio.gather(*(scenario(i, driver) for i, driver in enumerate(drivers)))
+    return time.perf_counter() - start
+
+
+async def compare(drivers, scenario, async_scenario, repeat=1):
+    """
+    Run both variants on the same browsers in turns, so both see the same service state
+    :param drivers: list of AsyncDriver
+    :param repeat: runs of each variant
+    :return: tuple of median seconds (thread per driver, async adapters)
+    """
+    loop = asyncio.get_running_loop()
+    threads, adapters = [], []
+    for _ in range(repeat):
+        threads.append(await loop.run_in_executor(None, run_threads, [driver.driver for driver in drivers], scenario))
+        adapters.append(await run_async(drivers, async_scenario))
+    return sorted(threads)[len(threads) // 2], sorted(adapters)[len(adapters) // 2]
+
+
+async def _benchmark(sessions, items, repeat):
+    """
+    :return: seconds of thread per driver run and of async adapters run
+    """
+    drivers = await asyncio.gather(*(start_async_browser() for _ in range(sessions)))
+    try:
+        return await compare(drivers, *items_scenario(items), repeat=repeat)
+    finally:
+        for driver in drivers:
+            _quit(driver.driver)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Throughput of async adapters against thread per driver')
+    parser.add_argument('--sessions', type=int, default=10, help='browsers driven at once')
+    parser.add_argument('--items', type=int, default=5, help='items added and deleted by each browser')
+    parser.add_argument('--repeat', type=int, default=3, help='runs of each variant, median is reported')
+    parser.add_argument('--latency', type=float, default=0.05, help='stand-in latency, seconds')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    with StandInServer(latency=args.latency) as server:
+        set_base_url(server.url)
+        threads, adapters = asyncio.run(_benchmark(args.sessions, args.items, args.repeat))
+
+    operations = args.sessions * args.items * 2
+    logging.info('Thread per driver: %d operations in %.2fs, %.1f ops/s', operations, threads, operations / threads)
+    logging.info('Async adapters (%d pool threads): %d operations in %.2fs, %.1f ops/s',
+                 Config.ASYNC_WORKERS, operations, adapters, operations / adapters)
+    logging.info('Async adapters / thread per driver time: %.2f', adapters / threads)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""
+Failure artifacts: screenshots, DOM snapshots and browser console log of a test
+are grabbed from the browser, then decoded, deduplicated and archived in background
+"""
+import os
+import json
+import base64
+import hashlib
+import logging
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from selenium.common.exceptions import WebDriverException
+
+from .config import Config
+from .namespace import worker_id
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='artifacts')
+_pending = []
+_current = None
+
+
+def artifacts_dir():
+    """
+    Config.DATA_DIR, subdirectory per pytest-xdist worker in parallel run
+    :return: string
+    """
+    return Config.DATA_DIR if worker_id() == 'master' else os.path.join(Config.DATA_DIR, worker_id())
+
+
+class ArtifactBundle:
+    """
+    Artifacts of one test, saved to one zip archive
+    """
+
+    def __init__(self, test_name):
+        self.test_name = test_name
+        self.path = os.path.join(artifacts_dir(), f'{test_name}.zip')
+        self._frames = []
+        self._console = []
+        # browser of last capture, console log is read from it once in finish
+        self._driver = None
+
+    def capture(self, driver, name):
+        """
+        Grab screenshot (not decoded) and DOM. Only browser round trips are done here
+        :param driver: selenium.webdriver
+        :param name: screenshot name
+        :return: None
+        """
+        self._driver = driver
+        try:
+            self._frames.append((name, driver.get_screenshot_as_base64(), driver.page_source))
+        except WebDriverException as exc:
+            logging.warning(f'Cannot capture "{name}": {exc.msg}')
+
+    def finish(self):
+        """
+        Read console log of test and write archive in background
+        :return: Future or None if nothing was captured
+        """
+        if not self._frames:
+            return None
+        try:
+            self._console = self._driver.get_log('browser')
+        except WebDriverException as exc:
+            logging.warning(f'Cannot read console log: {exc.msg}')
+        self._driver = None
+        future = _executor.submit(self._write)
+        _pending.append(future)
+        return future
+
+    def _write(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        last_screenshot, last_dom = None, None
+        with zipfile.ZipFile(self.path, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for name, screenshot, dom in self._frames:
+                stem = os.path.splitext(name)[0]
+                digest = hashlib.sha1(screenshot.encode('ascii')).hexdigest()
+                # identical consecutive frames are saved once
+                if digest != last_screenshot:
+                    # png is already compressed
+                    archive.writestr(name, base64.b64decode(screenshot), zipfile.ZIP_STORED)
+                    last_screenshot = digest
+                else:
+                    logging.info(f'Artifacts: "{name}" is the same as previous screenshot, skipped')
+                dom_digest = hashlib.sha1(dom.encode('utf-8')).hexdigest()
+                if dom_digest != last_dom:
+                    archive.writestr(f'{stem}.html', dom)
+                    last_dom = dom_digest
+            archive.writestr('console.json', json.dumps(self._console, indent=2))
+        logging.info(f'Artifacts saved to "{self.path}"')
+        return self.path
+
+
+def start(test_name):
+    """
+    Start collecting artifacts of test
+    :param test_name:
+    :return: ArtifactBundle
+    """
+    global _current
+    _current = ArtifactBundle(test_name)
+    return _current
+
+
+def finish():
+    """
+    Write artifacts of current test in background
+    :return: Future or None
+    """
+    global _current
+    bundle, _current = _current, None
+    return bundle.finish() if bundle else None
+
+
+def capture(driver, name):
+    """
+    Capture artifact to current test bundle.
+    Without current test (e.g. script run) artifact is written to its own archive
+    :param driver: selenium.webdriver
+    :param name: screenshot name
+    :return: None
+    """
+    if _current:
+        _current.capture(driver, name)
+    else:
+        bundle = ArtifactBundle(os.path.splitext(name)[0])
+        bundle.capture(driver, name)
+        bundle.finish()
+
+
+def wait_all():
+    """
+    Wait until all archives are written, log failed ones
+    :return: None
+    """
+    wait(_pending)
+    for future in _pending:
+        try:
+            future.result()
+        except Exception as exc:
+            logging.warning(f'Artifacts were not saved: {exc}')
+    _pending.clear()
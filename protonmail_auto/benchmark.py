@@ -0,0 +1,179 @@
+"""
+Benchmark of page object operations against local stand-in server.
+Usage: python -m protonmail_auto.benchmark --rows 10 100 1000 --output data/benchmark.json --baseline baseline.json
+"""
+import sys
+import json
+import time
+import logging
+import argparse
+
+from .browser import create_driver
+from .locators import ColorsLocators
+from .pages import LoginPage, SettingsFoldersPage, set_base_url
+from .standin import StandInServer
+from .timeouts import percentile
+
+ROW_COUNTS = [10, 100, 1000, 10000]
+# differences smaller than this are noise, seconds
+NOISE_FLOOR = 0.005
+
+
+class CommandCounter:
+    """
+    Counts WebDriver commands sent by driver
+    """
+
+    def __init__(self, driver):
+        self.count = 0
+        self._execute = driver.execute
+        driver.execute = self._counting_execute
+
+    def _counting_execute(self, driver_command, params=None):
+        self.count += 1
+        return self._execute(driver_command, params)
+
+    def reset(self):
+        self.count = 0
+
+
+def summarize(samples, commands):
+    return {
+        'p50': percentile(samples, 50),
+        'p95': percentile(samples, 95),
+        'max': max(samples),
+        'commands': max(commands),
+        'samples': len(samples),
+    }
+
+
+def color_style(hex_color):
+    """
+    '#7272a7' -> 'color: rgb(114, 114, 167);' as in ColorsMap
+    """
+    r, g, b = (int(hex_color[i:i + 2], 16) for i in (1, 3, 5))
+    return f'color: rgb({r}, {g}, {b});'
+
+
+class Benchmark:
+    def __init__(self, driver, server, repeat=5):
+        self.driver = driver
+        self.server = server
+        self.repeat = repeat
+        self.counter = CommandCounter(driver)
+        self.login_page = LoginPage(driver)
+        self.settings_page = SettingsFoldersPage(driver)
+        self.results = {}
+
+    def _measure(self, name, rows, action, setup=None, teardown=None):
+        """
+        Run action self.repeat times, setup and teardown are not measured
+        :param name: operation name
+        :param rows: number of rows in table
+        :param action: callable, gets index of run
+        :return: None
+        """
+        samples, commands = [], []
+        for i in range(self.repeat):
+            if setup:
+                setup(i)
+            self.counter.reset()
+            start = time.perf_counter()
+            action(i)
+            samples.append(time.perf_counter() - start)
+            commands.append(self.counter.count)
+            if teardown:
+                teardown(i)
+        self.results.setdefault(name, {})[str(rows)] = summarize(samples, commands)
+        logging.info(f'Benchmark {name} rows={rows}: {self.results[name][str(rows)]}')
+
+    def _logout(self, _):
+        self.driver.delete_all_cookies()
+
+    def _wait_notification(self, text):
+        self.settings_page.success_notification_appeared(text)
+
+    def run(self, row_counts=None):
+        color = ColorsLocators.RGB_114_114_167
+        for rows in row_counts or ROW_COUNTS:
+            self.server.items.seed(rows)
+            # checked item is the last one, worst case for search
+            last = self.server.items.all()[-1]
+
+            self._measure('login', rows, lambda i: self.login_page.login(), setup=self._logout)
+            self._measure('go_to_settings_page', rows, lambda i: self.settings_page.go_to_settings_page())
+            self._measure('_add_item', rows,
+                          lambda i: self.settings_page._add_item(f'bench_{rows}_{i}', color, 'folder'),
+                          teardown=lambda i: self._wait_notification(f'bench_{rows}_{i} created'))
+            # without cached row, otherwise only the first run looks the item up
+            self._measure('item_color_is_correct', rows,
+                          lambda i: self.settings_page.item_color_is_correct(last['name'], color_style(last['color'])),
+                          setup=lambda i: self.settings_page._cache.invalidate())
+            self._measure('edit_item', rows,
+                          lambda i: self.settings_page.edit_item(f'bench_{rows}_{i}', f'bench_edit_{rows}_{i}', color),
+                          teardown=lambda i: self._wait_notification(f'bench_edit_{rows}_{i} updated'))
+            self._measure('delete_item', rows,
+                          lambda i: self.settings_page.delete_item(f'bench_edit_{rows}_{i}'),
+                          teardown=lambda i: self._wait_notification(f'bench_edit_{rows}_{i} removed'))
+        return self.results
+
+
+def compare(results, baseline, threshold):
+    """
+    Find operations slower than baseline
+    :param results: benchmark results
+    :param baseline: stored results of previous run
+    :param threshold: allowed slowdown, 0.2 means 20%
+    :return: list of strings describing regressions
+    """
+    regressions = []
+    for name, by_rows in results.items():
+        for rows, current in by_rows.items():
+            base = baseline.get(name, {}).get(rows)
+            if not base:
+                continue
+            for metric in ('p50', 'p95'):
+                if current[metric] - base[metric] > NOISE_FLOOR and current[metric] > base[metric] * (1 + threshold):
+                    regressions.append(f'{name} rows={rows} {metric}: {current[metric]:.4f}s, '
+                                       f'baseline {base[metric]:.4f}s')
+            if current['commands'] > base['commands']:
+                regressions.append(f'{name} rows={rows} commands: {current["commands"]}, '
+                                   f'baseline {base["commands"]}')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark of page object operations against stand-in server')
+    parser.add_argument('--rows', type=int, nargs='+', default=ROW_COUNTS, help='numbers of rows in table')
+    parser.add_argument('--repeat', type=int, default=5, help='runs of each operation')
+    parser.add_argument('--output', default='benchmark.json', help='results json file')
+    parser.add_argument('--baseline', help='baseline json file to compare with')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown against baseline')
+    parser.add_argument('--profile', help='browser profile, Config.BROWSER_PROFILE by default')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    with StandInServer() as server:
+        set_base_url(server.url)
+        driver = create_driver(args.profile)
+        try:
+            results = Benchmark(driver, server, args.repeat).run(args.rows)
+        finally:
+            driver.quit()
+
+    with open(args.output, 'w', encoding='utf-8') as w_file:
+        json.dump(results, w_file, indent=2)
+    logging.info(f'Results saved to "{args.output}"')
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as r_file:
+            regressions = compare(results, json.load(r_file), args.threshold)
+        for regression in regressions:
+            logging.warning(f'Regression: {regression}')
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
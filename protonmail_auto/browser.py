@@ -0,0 +1,323 @@
+"""
+Browser profiles and driver factory.
+Compare page load time of profiles: python -m protonmail_auto.browser --profiles default lean headless
+"""
+import os
+import sys
+import time
+import atexit
+import logging
+import argparse
+import threading
+
+from selenium import webdriver
+from selenium.webdriver.chrome.remote_connection import ChromeRemoteConnection
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.remote.webdriver import WebDriver as RemoteWebDriver
+from selenium.webdriver.support.wait import WebDriverWait
+
+from .config import Config
+from .namespace import worker_id
+
+# stylesheet injected to every document when animations are disabled
+_NO_ANIMATIONS_SCRIPT = """
+document.addEventListener('DOMContentLoaded', function () {
+    var style = document.createElement('style');
+    style.textContent = '*, *::before, *::after { animation: none !important; transition: none !important; }';
+    document.head.appendChild(style);
+});
+"""
+
+FONT_URLS = ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot']
+IMAGE_URLS = ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.ico']
+TRACKER_URLS = ['*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*']
+
+_LOAD_FINISHED_SCRIPT = """
+return document.readyState === 'complete' && window.performance.timing.loadEventEnd > 0;
+"""
+
+
+class BrowserProfile:
+    """
+    Chrome settings used to start browser
+    """
+
+    def __init__(self, headless=False, block_images=False, block_fonts=False, disable_animations=False,
+                 url_blocklist=None, cache_dir=None):
+        """
+        :param headless: start browser without window
+        :param block_images: do not load images
+        :param block_fonts: do not load web fonts
+        :param disable_animations: disable css animations and transitions
+        :param url_blocklist: url patterns blocked by DevTools network interception, e.g. '*.woff'
+        :param cache_dir: disk cache root directory, relative to Config.DATA_DIR.
+            Each running browser gets own subdirectory, see _CacheDirs
+        """
+        self.headless = headless
+        self.block_images = block_images
+        self.block_fonts = block_fonts
+        self.disable_animations = disable_animations
+        self.url_blocklist = list(url_blocklist or [])
+        self.cache_dir = cache_dir
+
+    def blocked_urls(self):
+        urls = list(self.url_blocklist)
+        if self.block_fonts:
+            urls += FONT_URLS
+        if self.block_images:
+            urls += IMAGE_URLS
+        return urls
+
+    def build_options(self, cache_dir=None):
+        """
+        :param cache_dir: disk cache directory of this browser
+        :return: ChromeOptions
+        """
+        options = webdriver.ChromeOptions()
+        if self.headless:
+            options.add_argument('--headless')
+            options.add_argument('--window-size=1920,1080')
+        if self.block_images:
+            options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            options.add_argument(f'--disk-cache-dir={os.path.abspath(cache_dir)}')
+        return options
+
+    def apply(self, driver):
+        """
+        Settings which are applied through DevTools after browser start
+        :param driver: selenium.webdriver.Chrome
+        :return: None
+        """
+        blocked = self.blocked_urls()
+        if blocked:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': blocked})
+        if self.disable_animations:
+            driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': _NO_ANIMATIONS_SCRIPT})
+
+
+PROFILES = {
+    'default': BrowserProfile(),
+    'lean': BrowserProfile(block_images=True, block_fonts=True, disable_animations=True,
+                           url_blocklist=TRACKER_URLS, cache_dir='browser_cache'),
+    'headless': BrowserProfile(headless=True, block_images=True, block_fonts=True, disable_animations=True,
+                               url_blocklist=TRACKER_URLS, cache_dir='browser_cache'),
+}
+
+
+def get_profile(name=None):
+    """
+    :param name: profile name, Config.BROWSER_PROFILE by default
+    :return: BrowserProfile
+    """
+    name = name or Config.BROWSER_PROFILE
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise Exception(f'Unknown browser profile "{name}". Available: {list(PROFILES)}')
+
+
+class _CacheDirs:
+    """
+    Disk cache directories of running browsers. Chrome instances must not share one cache directory,
+    so each browser takes free numbered slot, slots are reused by next browsers and runs
+    """
+
+    def __init__(self):
+        self._used = set()
+        self._lock = threading.Lock()
+
+    def acquire(self, root):
+        """
+        :param root: cache root directory, relative to Config.DATA_DIR
+        :return: path of free cache directory
+        """
+        with self._lock:
+            slot = 0
+            while True:
+                path = os.path.join(Config.DATA_DIR, root, f'{worker_id()}_{slot}')
+                if path not in self._used:
+                    self._used.add(path)
+                    return path
+                slot += 1
+
+    def release(self, path):
+        with self._lock:
+            self._used.discard(path)
+
+
+_cache_dirs = _CacheDirs()
+
+
+class _Chrome(webdriver.Chrome):
+    """
+    Chrome which frees its disk cache directory on quit
+    """
+    cache_dir = None
+
+    def quit(self):
+        try:
+            webdriver.Chrome.quit(self)
+        finally:
+            _cache_dirs.release(self.cache_dir)
+
+
+class _SharedServiceChrome(_Chrome):
+    """
+    Chrome session on already started chromedriver service.
+    Commands are sent through keep-alive connection of session
+    """
+
+    def __init__(self, service, options):
+        self.service = service
+        executor = ChromeRemoteConnection(remote_server_addr=service.service_url, keep_alive=True)
+        RemoteWebDriver.__init__(self, command_executor=executor, desired_capabilities=options.to_capabilities())
+        self._is_remote = False
+
+    def quit(self):
+        # close session only, service is shared with other sessions
+        try:
+            RemoteWebDriver.quit(self)
+        finally:
+            _cache_dirs.release(self.cache_dir)
+
+
+class _ServiceStats:
+    def __init__(self):
+        self.start_time = 0.0
+        self.sessions = 0
+
+
+_service = None
+_service_lock = threading.Lock()
+service_stats = _ServiceStats()
+
+
+def get_service():
+    """
+    chromedriver service of current process (pytest-xdist worker), started on first call
+    :return: Service
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            started = time.perf_counter()
+            service = Service(Config.CHROME_PATH)
+            service.start()
+            service_stats.start_time = time.perf_counter() - started
+            logging.info(f'chromedriver service started at {service.service_url} '
+                         f'in {service_stats.start_time:.3f}s')
+            _service = service
+            atexit.register(stop_service)
+        return _service
+
+
+def stop_service():
+    global _service
+    with _service_lock:
+        if _service is not None:
+            _service.stop()
+            _service = None
+            logging.info(f'chromedriver service stopped. {service_report()}')
+
+
+def service_report():
+    """
+    Time saved by shared chromedriver service: every session but the first would start own service,
+    estimated with measured start time of shared one
+    :return: string
+    """
+    saved = max(service_stats.sessions - 1, 0) * service_stats.start_time
+    return (f'{service_stats.sessions} sessions on shared chromedriver service, '
+            f'service started once in {service_stats.start_time:.3f}s, '
+            f'estimated time saved: {saved:.3f}s ((sessions - 1) x service start time)')
+
+
+def create_driver(profile=None, shared_service=None):
+    """
+    Start Chrome with profile
+    :param profile: BrowserProfile or profile name. Config.BROWSER_PROFILE by default
+    :param shared_service: use one chromedriver service for all sessions of process.
+        Config.SHARED_SERVICE by default
+    :return: selenium.webdriver.Chrome
+    """
+    if not isinstance(profile, BrowserProfile):
+        profile = get_profile(profile)
+    if shared_service is None:
+        shared_service = Config.SHARED_SERVICE
+    cache_dir = _cache_dirs.acquire(profile.cache_dir) if profile.cache_dir else None
+    try:
+        if shared_service:
+            driver = _SharedServiceChrome(get_service(), profile.build_options(cache_dir))
+            with _service_lock:
+                service_stats.sessions += 1
+        else:
+            driver = _Chrome(Config.CHROME_PATH, options=profile.build_options(cache_dir))
+    except Exception:
+        _cache_dirs.release(cache_dir)
+        raise
+    driver.cache_dir = cache_dir
+    profile.apply(driver)
+    return driver
+
+
+def page_load_time(driver, url, timeout=30):
+    """
+    Open url and get its load time from Navigation Timing.
+    loadEventEnd is set after load event handlers finish, so wait for it before reading
+    :param driver: selenium.webdriver
+    :param url:
+    :param timeout: seconds to wait for load event end
+    :return: seconds
+    """
+    driver.get(url)
+    WebDriverWait(driver, timeout).until(lambda d: d.execute_script(_LOAD_FINISHED_SCRIPT))
+    return driver.execute_script(
+        'var t = window.performance.timing; return (t.loadEventEnd - t.navigationStart) / 1000;')
+
+
+def compare_profiles(names, repeat=3):
+    """
+    Measure load time of login and settings pages for each profile
+    :param names: profile names
+    :param repeat: loads of each page
+    :return: dict {profile: {url: median seconds}}
+    """
+    from .pages import LoginPage, SettingsFoldersPage
+
+    results = {}
+    for name in names:
+        driver = create_driver(name)
+        try:
+            LoginPage(driver).login_with_session()
+            results[name] = {}
+            for url in (LoginPage.URL, SettingsFoldersPage.URL):
+                samples = sorted(page_load_time(driver, url) for _ in range(repeat))
+                results[name][url] = samples[len(samples) // 2]
+        finally:
+            driver.quit()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare page load time of browser profiles')
+    parser.add_argument('--profiles', nargs='+', default=list(PROFILES), choices=list(PROFILES))
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    started = time.perf_counter()
+    results = compare_profiles(args.profiles, args.repeat)
+    baseline = results.get('default')
+    for name, loads in results.items():
+        for url, seconds in loads.items():
+            diff = f' ({seconds - baseline[url]:+.3f}s vs default)' if baseline and name != 'default' else ''
+            print(f'{name:10s} {seconds:7.3f}s {url}{diff}')
+    print(f'Total: {time.perf_counter() - started:.1f}s')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
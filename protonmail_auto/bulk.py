@@ -0,0 +1,44 @@
+import time
+from collections import namedtuple
+
+# submitted - dialog was filled and submitted without errors,
+# notified - success notification appeared, verified - table has expected state
+ItemResult = namedtuple('ItemResult', ['name', 'submitted', 'notified', 'verified'])
+
+
+class BulkReport:
+    """
+    Per-item results and throughput of bulk operation on Folders/labels page
+    """
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.results = []
+        self._started = time.monotonic()
+        self.elapsed = 0.0
+
+    def finish(self):
+        self.elapsed = time.monotonic() - self._started
+
+    @property
+    def throughput(self):
+        """
+        processed items per second
+        :return: float
+        """
+        return len(self.results) / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def ok(self):
+        return all(self.is_ok(result) for result in self.results)
+
+    @staticmethod
+    def is_ok(result):
+        return result.submitted and result.notified and result.verified
+
+    def failed(self):
+        return [result for result in self.results if not self.is_ok(result)]
+
+    def __str__(self):
+        return (f'{self.operation}: {len(self.results)} items, {len(self.failed())} failed, '
+                f'{self.elapsed:.2f}s, {self.throughput:.2f} items/sec')
@@ -0,0 +1,81 @@
+"""
+Single registry of item colors, merged from ColorsLocators and ColorsMap,
+and normalization of color values to (r, g, b)
+"""
+import re
+from collections import namedtuple
+
+from .locators import ColorsLocators, ColorsMap
+
+# name - attribute name in ColorsLocators/ColorsMap, e.g. RGB_114_114_167
+Color = namedtuple('Color', ['name', 'rgb', 'hex', 'locator', 'style'])
+
+_RGB_RE = re.compile(r'rgba?\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)')
+_HEX_RE = re.compile(r'#([0-9a-fA-F]{6}|[0-9a-fA-F]{3})\b')
+
+
+def normalize(value):
+    """
+    Convert color to (r, g, b)
+    :param value: 'rgb(1, 2, 3)', 'color: rgb(1, 2, 3);', '#010203', '#123',
+        ColorsLocators/ColorsMap attribute name, color locator or (r, g, b)
+    :return: tuple (r, g, b) or None if value is not a color
+    """
+    if value is None:
+        return None
+    if isinstance(value, tuple):
+        if len(value) == 3 and all(isinstance(i, int) for i in value):
+            return value
+        # locator (By.XPATH, "//*[@data-test-id='color-selector:#7272a7']")
+        value = value[1]
+    if value in registry:
+        return registry[value].rgb
+    match = _RGB_RE.search(value)
+    if match:
+        return tuple(int(i) for i in match.groups())
+    match = _HEX_RE.search(value)
+    if match:
+        digits = match.group(1)
+        if len(digits) == 3:
+            digits = ''.join(i * 2 for i in digits)
+        return tuple(int(digits[i:i + 2], 16) for i in (0, 2, 4))
+    return None
+
+
+def _build_registry():
+    result = {}
+    for name in ColorsLocators.__dict__:
+        if not name.startswith('RGB_'):
+            continue
+        locator = getattr(ColorsLocators, name)
+        style = getattr(ColorsMap, name)
+        rgb = tuple(int(i) for i in _RGB_RE.search(style).groups())
+        hex_ = _HEX_RE.search(locator[1]).group(0)
+        result[name] = Color(name, rgb, hex_, locator, style)
+    return result
+
+
+# name -> Color
+registry = _build_registry()
+
+# checked item color. expected and actual are (r, g, b), actual is None if item is not found
+ColorCheck = namedtuple('ColorCheck', ['name', 'expected', 'actual', 'ok'])
+
+
+class ColorDiff:
+    def __init__(self, checks):
+        self.checks = list(checks)
+
+    @property
+    def ok(self):
+        return all(check.ok for check in self.checks)
+
+    def mismatches(self):
+        return [check for check in self.checks if check.actual is not None and not check.ok]
+
+    def missing(self):
+        return [check.name for check in self.checks if check.actual is None]
+
+    def __str__(self):
+        return (f'{len(self.checks)} items checked, {len(self.mismatches())} wrong colors, '
+                f'{len(self.missing())} not found')
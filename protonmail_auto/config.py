@@ -1,33 +1,143 @@
 import os
 import json
-import sys
+
+# environment variables PROTONMAIL_<SETTING> override Config settings
+ENV_PREFIX = 'PROTONMAIL_'
+
+
+class ConfigError(Exception):
+    pass
 
 
 def get_account_data():
     """
     Read account data from separate json file
-    :return: None
+    :return: dict with username and password
     """
     try:
         with open(Config.ACCOUNT_DATA, 'r', encoding='utf-8') as r_file:
             data = json.load(r_file)
-            Config.USERNAME = data['username']
-            Config.PASSWORD = data['password']
+        return {'username': data['username'], 'password': data['password']}
     except FileNotFoundError:
-        print(f'Cannot find account config file "{Config.ACCOUNT_DATA}". Exit.')
-        sys.exit(2)
-    except json.decoder.JSONDecodeError:
-        print(f'"{Config.ACCOUNT_DATA}" config file is incorrect json file. Exit.')
-        sys.exit(3)
+        raise ConfigError(f'Cannot find account config file "{Config.ACCOUNT_DATA}"')
+    except (json.decoder.JSONDecodeError, KeyError, TypeError):
+        raise ConfigError(f'"{Config.ACCOUNT_DATA}" config file is incorrect json file')
+
+
+def _env(name, default):
+    """
+    get setting from environment, converted to type of default value
+    :param name: setting name
+    :param default: value if not set in environment
+    :return: setting value
+    """
+    value = os.environ.get(f'{ENV_PREFIX}{name}')
+    if value is None:
+        return default
+    return type(default)(value)
+
+
+def _account_value(key):
+    value = os.environ.get(f'{ENV_PREFIX}{key.upper()}')
+    return value if value is not None else get_account_data()[key]
 
 
-class Config:
-    USERNAME = ''
-    PASSWORD = ''
-    CHROME_PATH = os.path.join(os.path.dirname(__file__), 'tools', 'chromedriver.exe')
-    DATA_DIR = 'data'
-    ACCOUNT_DATA = os.path.join(os.path.dirname(__file__), 'account_details.json')
+class _LazyConfig(type):
+    """
+    Resolves account settings on first access and caches them,
+    so importing the package does no file I/O.
+    Derived settings are computed from other settings on every access until they are set explicitly,
+    so e.g. override of DATA_DIR moves SESSION_DIR too
+    """
+    _LAZY = {
+        'USERNAME': lambda: _account_value('username'),
+        'PASSWORD': lambda: _account_value('password'),
+    }
+    _DERIVED = {
+        'SESSION_DIR': lambda cls: os.path.join(cls.DATA_DIR, 'sessions'),
+        'WAIT_HISTORY': lambda cls: os.path.join(cls.DATA_DIR, 'wait_latency.json'),
+    }
+
+    def __getattr__(cls, name):
+        if name in cls._DERIVED:
+            return _env(name, cls._DERIVED[name](cls))
+        if name not in cls._LAZY:
+            raise AttributeError(name)
+        value = cls._LAZY[name]()
+        setattr(cls, name, value)
+        return value
 
 
-get_account_data()
+class Config(metaclass=_LazyConfig):
+    # USERNAME and PASSWORD are read on first access from PROTONMAIL_USERNAME/PROTONMAIL_PASSWORD
+    # environment variables or from ACCOUNT_DATA file
+    # can be pointed to local stand-in server, see protonmail_auto.standin
+    BASE_URL = _env('BASE_URL', 'https://beta.protonmail.com')
+    CHROME_PATH = _env('CHROME_PATH', os.path.join(os.path.dirname(__file__), 'tools', 'chromedriver.exe'))
+    DATA_DIR = _env('DATA_DIR', 'data')
+    ACCOUNT_DATA = _env('ACCOUNT_DATA', os.path.join(os.path.dirname(__file__), 'account_details.json'))
+    # SESSION_DIR is DATA_DIR/sessions by default, see _LazyConfig._DERIVED
+    # seconds before saved session is considered expired
+    SESSION_TTL = _env('SESSION_TTL', 3600)
+    # prefix for names of items created by tests
+    TEST_NAMESPACE = _env('TEST_NAMESPACE', 'qa')
+    # seconds since start of other test run after which its items are swept as leftovers (pytest --sweep)
+    SWEEP_MIN_AGE = _env('SWEEP_MIN_AGE', 3600)
+    # browsers kept logged in by BrowserPool
+    POOL_SIZE = _env('POOL_SIZE', 1)
+    # browser is restarted after this number of leases
+    POOL_MAX_LEASES = _env('POOL_MAX_LEASES', 20)
+    # seconds to wait for free browser
+    POOL_LEASE_TIMEOUT = _env('POOL_LEASE_TIMEOUT', 120)
+    # seconds to wait for Welcome dialog after Inbox is loaded
+    WELCOME_DIALOG_GRACE = _env('WELCOME_DIALOG_GRACE', 1.0)
+    # 1 - learn wait timeouts from latency history, 0 - fixed timeouts
+    ADAPTIVE_TIMEOUTS = _env('ADAPTIVE_TIMEOUTS', 1)
+    # WAIT_HISTORY is DATA_DIR/wait_latency.json by default
+    # learned timeout is percentile of latency plus margin (seconds), limited by min/max
+    TIMEOUT_PERCENTILE = _env('TIMEOUT_PERCENTILE', 99.0)
+    TIMEOUT_MARGIN = _env('TIMEOUT_MARGIN', 0.5)
+    TIMEOUT_MIN = _env('TIMEOUT_MIN', 1.0)
+    TIMEOUT_MAX = _env('TIMEOUT_MAX', 30.0)
+    # rows fetched by one call of SettingsFoldersPage.iter_items
+    ITEMS_CHUNK_SIZE = _env('ITEMS_CHUNK_SIZE', 50)
+    # seconds to wait for lazily rendered rows after scrolls to the end of table, in total per lookup,
+    # 0 - table is not lazy
+    TABLE_SETTLE_TIME = _env('TABLE_SETTLE_TIME', 0.3)
+    # browser profile from protonmail_auto.browser.PROFILES
+    BROWSER_PROFILE = _env('BROWSER_PROFILE', 'default')
+    # 1 - start one chromedriver for all browsers of process, 0 - chromedriver per browser
+    SHARED_SERVICE = _env('SHARED_SERVICE', 1)
+    # 1 - sample browser health between tests and recycle browser above thresholds, see protonmail_auto.health
+    HEALTH_CHECK = _env('HEALTH_CHECK', 1)
+    # used JS heap, MB
+    HEALTH_MAX_JS_HEAP = _env('HEALTH_MAX_JS_HEAP', 256)
+    HEALTH_MAX_DOM_NODES = _env('HEALTH_MAX_DOM_NODES', 30000)
+    # RSS of browser processes, MB, sampled if psutil is installed
+    HEALTH_MAX_RSS = _env('HEALTH_MAX_RSS', 1024)
+    # structured log, see protonmail_auto.logs
+    LOG_LEVEL = _env('LOG_LEVEL', 'INFO')
+    # log file is rotated and gzipped after this size, bytes
+    LOG_MAX_BYTES = _env('LOG_MAX_BYTES', 10 * 1024 * 1024)
+    LOG_BACKUPS = _env('LOG_BACKUPS', 5)
+    # longer strings in responses are cut in trace of WebDriver commands, see protonmail_auto.trace
+    TRACE_MAX_VALUE = _env('TRACE_MAX_VALUE', 500)
+    # threads running blocking page object calls of awaitable adapters, see protonmail_auto.aio
+    ASYNC_WORKERS = _env('ASYNC_WORKERS', 32)
 
+    @classmethod
+    def override(cls, **settings):
+        """
+        Set settings, e.g. from command line. String values are converted to type of current value
+        :param settings: NAME=value
+        :return: None
+        """
+        for name, value in settings.items():
+            name = name.upper()
+            if name in _LazyConfig._LAZY:
+                setattr(cls, name, value)
+                continue
+            if not hasattr(cls, name):
+                raise ConfigError(f'Unknown setting "{name}"')
+            current = getattr(cls, name)
+            setattr(cls, name, type(current)(value) if isinstance(value, str) else value)
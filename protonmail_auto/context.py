@@ -0,0 +1,22 @@
+"""
+Test run by current thread, set by pytest hooks in conftest.py.
+Work of background threads (browser start, recycle, sweep) is not attributed to any test
+"""
+import threading
+
+_local = threading.local()
+
+
+def current_test():
+    """
+    :return: pytest node id or None
+    """
+    return getattr(_local, 'test', None)
+
+
+def set_current_test(nodeid):
+    """
+    :param nodeid: pytest node id, None after test
+    :return: None
+    """
+    _local.test = nodeid
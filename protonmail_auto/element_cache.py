@@ -0,0 +1,58 @@
+from selenium.common.exceptions import StaleElementReferenceException
+
+
+class ElementCache:
+    """
+    Cache of located elements of page object, keyed by (locator, item name).
+    Cached element is used as is and re-located only if it became stale
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    def get(self, key, resolve):
+        """
+        get cached value or resolve and cache it. None is not cached
+        :param key: tuple (locator, item name)
+        :param resolve: callable locating the value
+        :return: cached value
+        """
+        if key not in self._entries:
+            value = resolve()
+            if value is None:
+                return None
+            self._entries[key] = value
+        return self._entries[key]
+
+    def put(self, key, value):
+        self._entries[key] = value
+
+    def use(self, key, resolve, action):
+        """
+        Run action with cached element, on StaleElementReferenceException
+        re-locate element and run action again
+        :param key: tuple (locator, item name)
+        :param resolve: callable locating the element
+        :param action: callable getting element
+        :return: result of action or None if element cannot be located
+        """
+        element = self.get(key, resolve)
+        if element is None:
+            return None
+        try:
+            return action(element)
+        except StaleElementReferenceException:
+            self._entries.pop(key, None)
+            element = self.get(key, resolve)
+            return action(element) if element is not None else None
+
+    def invalidate(self, name=None):
+        """
+        Remove entries of item or all entries
+        :param name: item name, None - all entries
+        :return: None
+        """
+        if name is None:
+            self._entries.clear()
+        else:
+            self._entries = {key: value for key, value in self._entries.items() if key[1] != name}
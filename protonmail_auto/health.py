@@ -0,0 +1,148 @@
+"""
+Health of long living browsers: JS heap, DOM nodes and RSS of browser processes
+are sampled between tests, browser is recycled by BrowserPool if threshold is crossed
+"""
+import os
+import json
+import time
+import logging
+
+from selenium.common.exceptions import WebDriverException
+
+from .config import Config
+from .context import current_test
+
+try:
+    import psutil
+except ImportError:
+    # RSS is not sampled without psutil
+    psutil = None
+
+MB = 1024 * 1024
+
+
+class HealthSample:
+    def __init__(self, js_heap=None, dom_nodes=None, rss=None):
+        """
+        :param js_heap: used JS heap, bytes
+        :param dom_nodes: DOM nodes of renderer, including detached
+        :param rss: RSS of browser and its child processes, bytes
+        """
+        self.js_heap = js_heap
+        self.dom_nodes = dom_nodes
+        self.rss = rss
+
+    def as_dict(self):
+        return {'js_heap': self.js_heap, 'dom_nodes': self.dom_nodes, 'rss': self.rss}
+
+    def __str__(self):
+        heap = f'{self.js_heap / MB:.1f}MB' if self.js_heap is not None else '-'
+        rss = f'{self.rss / MB:.1f}MB' if self.rss is not None else '-'
+        return f'js_heap={heap} dom_nodes={self.dom_nodes} rss={rss}'
+
+
+def browser_rss(driver):
+    """
+    RSS of browser process of driver and its renderers, found by user data dir
+    :param driver: selenium.webdriver
+    :return: bytes or None if psutil is not installed or process is not found
+    """
+    user_data_dir = (getattr(driver, 'capabilities', None) or {}).get('chrome', {}).get('userDataDir')
+    if psutil is None or not user_data_dir:
+        return None
+    for process in psutil.process_iter(['cmdline']):
+        cmdline = process.info['cmdline'] or []
+        if f'--user-data-dir={user_data_dir}' in cmdline and not any(arg.startswith('--type=') for arg in cmdline):
+            try:
+                return sum(p.memory_info().rss for p in [process] + process.children(recursive=True))
+            except psutil.Error:
+                return None
+    return None
+
+
+def sample(driver):
+    """
+    :param driver: selenium.webdriver
+    :return: HealthSample
+    """
+    if not getattr(driver, '_health_enabled', False):
+        driver.execute_cdp_cmd('Performance.enable', {})
+        driver._health_enabled = True
+    metrics = {m['name']: m['value'] for m in driver.execute_cdp_cmd('Performance.getMetrics', {})['metrics']}
+    return HealthSample(metrics.get('JSHeapUsedSize'), metrics.get('Nodes'), browser_rss(driver))
+
+
+class HealthMonitor:
+    def __init__(self, max_js_heap=None, max_dom_nodes=None, max_rss=None):
+        """
+        Thresholds, Config.HEALTH_MAX_* by default
+        :param max_js_heap: MB, Config.HEALTH_MAX_JS_HEAP by default
+        :param max_dom_nodes: Config.HEALTH_MAX_DOM_NODES by default
+        :param max_rss: MB, Config.HEALTH_MAX_RSS by default
+        """
+        # resolved on use, so Config can be overridden after import
+        self._limits = {'js_heap': max_js_heap, 'dom_nodes': max_dom_nodes, 'rss': max_rss}
+        # recycle events of current run
+        self.events = []
+
+    def limits(self):
+        """
+        :return: dict of thresholds, js_heap and rss in MB
+        """
+        return {'js_heap': self._limits['js_heap'] or Config.HEALTH_MAX_JS_HEAP,
+                'dom_nodes': self._limits['dom_nodes'] or Config.HEALTH_MAX_DOM_NODES,
+                'rss': self._limits['rss'] or Config.HEALTH_MAX_RSS}
+
+    def violations(self, health):
+        """
+        :param health: HealthSample
+        :return: list of strings, empty if browser is healthy
+        """
+        limits, found = self.limits(), []
+        if health.js_heap is not None and health.js_heap > limits['js_heap'] * MB:
+            found.append(f'js_heap {health.js_heap / MB:.1f}MB > {limits["js_heap"]}MB')
+        if health.dom_nodes is not None and health.dom_nodes > limits['dom_nodes']:
+            found.append(f'dom_nodes {health.dom_nodes} > {limits["dom_nodes"]}')
+        if health.rss is not None and health.rss > limits['rss'] * MB:
+            found.append(f'rss {health.rss / MB:.1f}MB > {limits["rss"]}MB')
+        return found
+
+    def check(self, driver, leases=0):
+        """
+        Sample browser and record recycle event if it should be recycled
+        :param driver: selenium.webdriver
+        :param leases: leases of browser, for report
+        :return: True if browser is healthy
+        """
+        try:
+            health = sample(driver)
+        except (WebDriverException, AttributeError) as exc:
+            # not Chrome or browser is broken, pool decides by reset
+            logging.info('Health: cannot sample browser: %s', exc)
+            return True
+        found = self.violations(health)
+        logging.info('Health: %s', health)
+        if found:
+            logging.warning('Health: recycle browser: %s', ', '.join(found))
+            self.events.append({'time': time.time(), 'test': current_test(), 'leases': leases,
+                                'reasons': found, **health.as_dict()})
+        return not found
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as w_file:
+            json.dump({'thresholds': self.limits(), 'recycles': self.events}, w_file, indent=2)
+
+    def summary_lines(self):
+        return [f'Recycled after {event["test"]} ({event["leases"]} leases): {", ".join(event["reasons"])}'
+                for event in self.events]
+
+
+monitor = HealthMonitor()
+
+
+def report_path(worker='master'):
+    name = 'health_report.json' if worker == 'master' else f'health_report_{worker}.json'
+    return os.path.join(Config.DATA_DIR, name)
@@ -0,0 +1,124 @@
+"""
+Counting and timing of WebDriver commands, attributed to page object method and pytest test
+"""
+import os
+import sys
+import json
+import time
+import threading
+from collections import defaultdict
+
+from .config import Config
+from .context import current_test
+
+
+class CommandRecorder:
+    def __init__(self):
+        self.enabled = False
+        # (test, page method, command) -> [count, total seconds]
+        self._stats = defaultdict(lambda: [0, 0.0])
+        self._lock = threading.Lock()
+
+    def record(self, command, elapsed, method):
+        with self._lock:
+            stats = self._stats[(current_test(), method, command)]
+            stats[0] += 1
+            stats[1] += elapsed
+
+    def clear(self):
+        with self._lock:
+            self._stats.clear()
+
+    def _ranking(self, key_index):
+        """
+        total count and time grouped by test (0), method (1) or command (2), slowest first
+        :return: list of dicts
+        """
+        grouped = defaultdict(lambda: [0, 0.0])
+        with self._lock:
+            for key, (count, total) in self._stats.items():
+                grouped[key[key_index]][0] += count
+                grouped[key[key_index]][1] += total
+        ranking = [{'name': name, 'count': count, 'time': total} for name, (count, total) in grouped.items()]
+        return sorted(ranking, key=lambda row: row['time'], reverse=True)
+
+    def by_test(self):
+        return self._ranking(0)
+
+    def by_method(self):
+        return self._ranking(1)
+
+    def by_command(self):
+        return self._ranking(2)
+
+    def report(self):
+        with self._lock:
+            details = [{'test': test, 'method': method, 'command': command, 'count': count, 'time': total}
+                       for (test, method, command), (count, total) in self._stats.items()]
+        return {'tests': self.by_test(), 'methods': self.by_method(), 'commands': self.by_command(),
+                'details': details}
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as w_file:
+            json.dump(self.report(), w_file, indent=2)
+
+    def summary_lines(self, top=10):
+        lines = []
+        for title, ranking in (('Tests', self.by_test()), ('Page methods', self.by_method())):
+            lines.append(f'{title} by WebDriver command time:')
+            for row in ranking[:top]:
+                # commands of background threads (browser start, recycle) have no test
+                lines.append(f'  {row["time"]:8.3f}s {row["count"]:6d} commands  {row["name"] or "(background)"}')
+        return lines
+
+
+recorder = CommandRecorder()
+
+
+def instrument(driver):
+    """
+    Wrap driver.execute to count and time every command. Does nothing if recorder is disabled
+    or driver is already instrumented. WebElement commands go through driver.execute too
+    :param driver: selenium.webdriver
+    :return: driver
+    """
+    if not recorder.enabled or getattr(driver, '_instrumented', False):
+        return driver
+    execute = driver.execute
+
+    def timed_execute(driver_command, params=None):
+        method = _page_method()
+        start = time.perf_counter()
+        try:
+            return execute(driver_command, params)
+        finally:
+            recorder.record(driver_command, time.perf_counter() - start, method)
+
+    driver.execute = timed_execute
+    driver._instrumented = True
+    return driver
+
+
+def _page_method():
+    """
+    Outermost page object method in call stack
+    :return: string like 'SettingsFoldersPage.delete_item' or None
+    """
+    from .pages import BasePage
+
+    method = None
+    frame = sys._getframe(2)
+    while frame:
+        obj = frame.f_locals.get('self')
+        if isinstance(obj, BasePage):
+            method = f'{type(obj).__name__}.{frame.f_code.co_name}'
+        frame = frame.f_back
+    return method
+
+
+def report_path(worker='master'):
+    name = 'commands_report.json' if worker == 'master' else f'commands_report_{worker}.json'
+    return os.path.join(Config.DATA_DIR, name)
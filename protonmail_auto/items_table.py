@@ -0,0 +1,39 @@
+from collections import namedtuple
+
+
+# element - WebElement of table row, index - position in table,
+# item_type - 'folder' or 'label', color - value of style attribute of color icon
+ItemRow = namedtuple('ItemRow', ['element', 'index', 'name', 'item_type', 'color'])
+
+
+class ItemsTable:
+    """
+    In-memory snapshot of Folders/labels table, indexed by item name
+    """
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self._by_name = {}
+        for row in self.rows:
+            # keep first match, same as search from the top of the table
+            self._by_name.setdefault(row.name, row)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __contains__(self, name):
+        return name in self._by_name
+
+    def get(self, name):
+        """
+        get row by item name
+        :param name: item name
+        :return: ItemRow or None
+        """
+        return self._by_name.get(name)
+
+    def names(self):
+        return [row.name for row in self.rows]
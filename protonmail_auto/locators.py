@@ -25,8 +25,11 @@ class SettingsFoldersLocators:
     ITEM_FOLDER_TYPE = (By.XPATH, "//*[@data-test-id='folders/labels:item-type:folder']")
     ITEM_LABEL_TYPE = (By.XPATH, "//*[@data-test-id='folders/labels:item-type:label']")
     ITEM_ANY_TYPE = (By.XPATH, f"{ITEM_LABEL_TYPE[1]} | {ITEM_FOLDER_TYPE[1]}")
+    # rows searched inside ITEMS_TABLE element
+    TABLE_ITEM_ANY_TYPE = (By.XPATH, f".{ITEM_LABEL_TYPE[1]} | .{ITEM_FOLDER_TYPE[1]}")
 
     ITEM_NAME = (By.XPATH, ".//span[@data-test-id='folders/labels:item-name' and text()='{}']")
+    ITEM_ANY_NAME = (By.XPATH, ".//span[@data-test-id='folders/labels:item-name']")
     ITEM_COLOR = (By.XPATH, ".//div/*[@class='icon-16p icon-16p flex-item-noshrink mr1 mtauto mbauto']")
 
     EDIT_ITEM_BTN = (By.XPATH, ".//button[@data-test-id='folders/labels:item-edit']")
@@ -64,13 +67,14 @@ class ColorsLocators:
     RGB_223_178_134 = (By.XPATH, "//*[@data-test-id='color-selector:#dfb286']")
 
     @classmethod
-    def get_random(cls):
+    def get_random(cls, rng=random):
         """
         get random color from all in this class
+        :param rng: random generator, e.g. random.Random(seed) to get the same colors in several processes
         :return: string. To get value use getattr()
         """
         all_ = [i for i in cls.__dict__ if not (i.startswith('__') or i.startswith('get'))]
-        res = random.choice(all_)
+        res = rng.choice(all_)
         # res = getattr(cls, res)
         return res
 
@@ -0,0 +1,162 @@
+"""
+Non-blocking structured logging: records are put to queue in caller thread
+and formatted to JSON lines by background thread, log file is rotated by size and gzipped
+"""
+import os
+import gzip
+import json
+import queue
+import shutil
+import logging
+import logging.handlers
+
+from .config import Config
+from .context import current_test
+from .namespace import worker_id
+
+# attributes of every LogRecord, everything else is passed with extra=
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+REDACTED = '***'
+
+
+class ContextFilter(logging.Filter):
+    """
+    Adds current test to record, runs in caller thread
+    """
+
+    def filter(self, record):
+        record.test = current_test()
+        return True
+
+
+class RedactingFormatter(logging.Formatter):
+    """
+    Replaces account credentials in output of wrapped formatter,
+    so message, exception and extra fields are covered. Runs in writer thread
+    """
+
+    def __init__(self, formatter):
+        super().__init__()
+        self.formatter = formatter
+
+    def format(self, record):
+        return redact(self.formatter.format(record))
+
+
+def credentials():
+    """
+    Account credentials to redact, only values already resolved by Config,
+    reading of account file is not triggered
+    :return: list of strings
+    """
+    return [value for value in (vars(Config).get('USERNAME'), vars(Config).get('PASSWORD'))
+            if isinstance(value, str) and value]
+
+
+def redact(text):
+    """
+    Replace account credentials in text, also in their JSON escaped form
+    :param text: formatted log record
+    :return: string
+    """
+    for secret in credentials():
+        for form in {secret, json.dumps(secret)[1:-1]}:
+            text = text.replace(form, REDACTED)
+    return text
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: time, level, message, test, page method, locator, duration
+    """
+
+    def format(self, record):
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'message': record.getMessage(),
+            'test': getattr(record, 'test', None),
+            'method': f'{record.module}.{record.funcName}',
+            'worker': worker_id(),
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRS and name not in data:
+                data[name] = value
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler formats message in caller thread, here it is left to writer thread
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def _gzip_rotator(source, dest):
+    with open(source, 'rb') as r_file, gzip.open(dest, 'wb') as w_file:
+        shutil.copyfileobj(r_file, w_file)
+    os.remove(source)
+
+
+def log_path(worker='master'):
+    name = 'log.jsonl' if worker == 'master' else f'log_{worker}.jsonl'
+    return os.path.join(Config.DATA_DIR, name)
+
+
+_listener = None
+_queue_handler = None
+
+
+def start(path=None, level=None, console=False):
+    """
+    Route root logger to queue, start background writer. Repeated calls do nothing
+    :param path: JSON lines file, log_path() of current worker by default
+    :param level: level name, Config.LOG_LEVEL by default
+    :param console: also write plain text to stderr
+    :return: None
+    """
+    global _listener, _queue_handler
+    if _listener:
+        return
+    path = path or log_path(worker_id())
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=Config.LOG_MAX_BYTES,
+                                                        backupCount=Config.LOG_BACKUPS, encoding='utf-8')
+    file_handler.namer = lambda name: f'{name}.gz'
+    file_handler.rotator = _gzip_rotator
+    file_handler.setFormatter(RedactingFormatter(JsonFormatter()))
+    handlers = [file_handler]
+    if console:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(RedactingFormatter(logging.Formatter('%(asctime)s [%(levelname)8s] %(message)s')))
+        handlers.append(stream_handler)
+
+    records = queue.SimpleQueue()
+    _queue_handler = _LazyQueueHandler(records)
+    _queue_handler.addFilter(ContextFilter())
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(level or Config.LOG_LEVEL)
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def stop():
+    """
+    Write queued records and stop writer
+    :return: None
+    """
+    global _listener, _queue_handler
+    if not _listener:
+        return
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener, _queue_handler = None, None
@@ -0,0 +1,47 @@
+import os
+import time
+import uuid
+
+from .config import Config
+
+# generated once per process, used when tests are run without pytest-xdist
+_LOCAL_RUN_ID = uuid.uuid4().hex[:6]
+# unix time of process start, put to names of items so sweeper can tell their age
+_STARTED = int(time.time())
+
+
+def worker_id():
+    """
+    pytest-xdist worker name (gw0, gw1..) or 'master' for non-parallel run
+    :return: string
+    """
+    return os.environ.get('PYTEST_XDIST_WORKER', 'master')
+
+
+def run_id():
+    """
+    id of test run. The same for all pytest-xdist workers of one run
+    :return: string
+    """
+    uid = os.environ.get('PYTEST_XDIST_TESTRUNUID')
+    return uid[:6] if uid else _LOCAL_RUN_ID
+
+
+class Namespace:
+    """
+    Prefix for names of test items, so parallel workers and runs
+    on one account never touch items of each other.
+    Prefix is <TEST_NAMESPACE>-<run>-<worker>-<unix time of worker start>
+    """
+
+    def __init__(self, run=None, worker=None, started=None):
+        self.prefix = f'{Config.TEST_NAMESPACE}-{run or run_id()}-{worker or worker_id()}-{started or _STARTED}'
+
+    def name(self, base_name):
+        return f'{self.prefix}-{base_name}'
+
+    def owns(self, name):
+        return bool(name) and name.startswith(f'{self.prefix}-')
+
+    def __str__(self):
+        return self.prefix
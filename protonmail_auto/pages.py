@@ -1,24 +1,58 @@
+import time
 import logging
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import StaleElementReferenceException
 from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.action_chains import ActionChains
-# noinspection PyPep8Naming
-from selenium.webdriver.support import expected_conditions as EC
 
+from . import colors
+from . import scripts
+from . import timeouts
+from . import waits
+from .bulk import BulkReport, ItemResult
 from .config import Config
+from .element_cache import ElementCache
+from .instrumentation import instrument
+from .items_table import ItemRow, ItemsTable
 from .locators import *
+from .profiling import profiled, profiler
+from .session import SessionStore
+from .trace import tracer
+
+
+def set_base_url(base_url):
+    """
+    Point page objects to another server, e.g. local stand-in
+    :param base_url: scheme and host, e.g. http://127.0.0.1:8080
+    :return: None
+    """
+    Config.BASE_URL = base_url.rstrip('/')
+
+
+class PageUrl:
+    """
+    URL of page, built from Config.BASE_URL when read,
+    so overrides of BASE_URL made after import are followed
+    """
+    def __init__(self, path):
+        self.path = path
+
+    def __get__(self, page, page_class):
+        return f'{Config.BASE_URL}{self.path}'
 
 
 class BasePage:
     def __init__(self, driver):
-        self.driver = driver
+        self.driver = tracer.attach(instrument(driver))
+        profiler.install(self.driver)
 
 
 class LoginPage(BasePage):
-    URL = 'https://beta.protonmail.com/login'
+    URL = PageUrl('/login')
 
+    @profiled(navigation=True)
     def login(self):
         """
         Log in to account specified in Config
@@ -26,68 +60,254 @@ class LoginPage(BasePage):
         """
         logging.info('Login..')
         self.driver.get(self.URL)
-        logging.info(f'Go to "{self.URL}"')
+        logging.info('Go to "%s"', self.URL)
 
-        wait = WebDriverWait(self.driver, 5)
-        username_field = wait.until(EC.element_to_be_clickable(LoginPageLocators.USERNAME_FIELD))
+        username_field = waits.until(self.driver, waits.clickable(LoginPageLocators.USERNAME_FIELD))
         username_field.send_keys(Config.USERNAME)
-        logging.info(f'Send "{Config.USERNAME}" to username field: {LoginPageLocators.USERNAME_FIELD}')
+        logging.info('Send username to username field: %s', LoginPageLocators.USERNAME_FIELD,
+                     extra={'locator': LoginPageLocators.USERNAME_FIELD})
 
         password_field = self.driver.find_element(*LoginPageLocators.PASSWORD_FIELD)
         password_field.send_keys(Config.PASSWORD)
         password_field.send_keys(Keys.ENTER)
-        logging.info(f'Send "{Config.PASSWORD}" to password field: {LoginPageLocators.PASSWORD_FIELD}')
+        logging.info('Send password to password field: %s', LoginPageLocators.PASSWORD_FIELD,
+                     extra={'locator': LoginPageLocators.PASSWORD_FIELD})
 
-        logged_in = False
+        # race Welcome dialog and Inbox title, whichever comes first
+        outcome, welcome_close_btn = None, None
         try:
-            _ = WebDriverWait(self.driver, 5).until(EC.title_contains('Inbox'))
-            logged_in = True
+            outcome, welcome_close_btn = waits.wait_for_any(self.driver, {
+                'welcome': waits.clickable(WelcomeDialogLocators.CLOSE_BTN),
+                'inbox': waits.title_contains('Inbox'),
+            })
         except TimeoutException:
             pass
 
+        logged_in = outcome == 'inbox'
+        if logged_in:
+            # dialog is rendered right after Inbox, no need to wait full timeout for it
+            try:
+                welcome_close_btn = waits.until(self.driver, waits.clickable(WelcomeDialogLocators.CLOSE_BTN),
+                                                timeout=Config.WELCOME_DIALOG_GRACE)
+            except TimeoutException:
+                pass
+
         # close welcome dialog if exist
-        try:
-            wait = WebDriverWait(self.driver, 5)
+        if welcome_close_btn:
             logging.info('Close Welcome dialog..')
-            welcome_close_btn = wait.until(EC.element_to_be_clickable(WelcomeDialogLocators.CLOSE_BTN))
             welcome_close_btn.click()
-            logging.info(f'Click on Close btn: "{WelcomeDialogLocators.CLOSE_BTN}"')
-        except (TimeoutException, NoSuchElementException):
-            pass
+            logging.info('Click on Close btn: "%s"', WelcomeDialogLocators.CLOSE_BTN,
+                         extra={'locator': WelcomeDialogLocators.CLOSE_BTN})
+
+        if outcome == 'welcome':
+            try:
+                logged_in = waits.until(self.driver, waits.title_contains('Inbox'))
+            except TimeoutException:
+                pass
 
         return logged_in
 
+    def login_with_session(self, store=None):
+        """
+        Restore saved session and check it on settings page.
+        Fall back to login() if saved session is absent or not valid
+        :param store: SessionStore. By default - store for Config.USERNAME
+        :return: True in case of success
+        """
+        store = store or SessionStore()
+        if store.restore(self.driver):
+            try:
+                SettingsFoldersPage(self.driver).go_to_settings_page(timeout=3)
+                logging.info('Logged in with saved session')
+                return True
+            except TimeoutException:
+                logging.info('Saved session is not valid. Login..')
+                store.clear()
+                self.driver.delete_all_cookies()
+                self.driver.execute_script('window.localStorage.clear(); window.sessionStorage.clear();')
+
+        logged_in = self.login()
+        if logged_in:
+            store.save(self.driver)
+        return logged_in
+
 
 class SettingsFoldersPage(BasePage):
-    URL = 'https://beta.protonmail.com/settings/labels'
+    URL = PageUrl('/settings/labels')
     TITLE = 'Folders/labels - ProtonMail'
+    ROW = 'row'
 
-    def go_to_settings_page(self):
+    def __init__(self, driver):
+        super().__init__(driver)
+        self._cache = ElementCache()
+        # True during bulk operation
+        self._bulk = False
+
+    @profiled(navigation=True)
+    def go_to_settings_page(self, timeout=None):
         self.driver.get(self.URL)
-        _ = WebDriverWait(self.driver, 5).until(EC.title_is(SettingsFoldersPage.TITLE))
+        # new document, cached elements and rows are gone
+        self._cache.invalidate()
+        _ = waits.until(self.driver, waits.title_is(SettingsFoldersPage.TITLE), timeout)
+        self.install_notification_recorder()
         return True
 
-    def _find_item_by_name(self, name):
+    def install_notification_recorder(self):
+        """
+        Start recording of notifications in current page.
+        Should be called after each page load, repeated calls do nothing
+        :return: None
+        """
+        self.driver.execute_script(scripts.NOTIFICATIONS_INSTALL)
+
+    def get_notifications(self, clear=False):
+        """
+        get notifications recorded since page load
+        :param clear: clear buffer after read
+        :return: list of dicts with text, class_name, timestamp (ms), empty if recorder cannot be read
         """
-        get all visible items, find needed by name
+        try:
+            return self.driver.execute_script(scripts.NOTIFICATIONS_GET, clear)
+        except WebDriverException as exc:
+            logging.warning('Cannot read notifications: %s', exc.msg)
+            return []
+
+    def get_items_snapshot(self):
+        """
+        get name, type, color and position of all visible items in one execute_script call
+        :return: ItemsTable
+        """
+        try:
+            _ = waits.until(self.driver, waits.presence_of(SettingsFoldersLocators.ITEMS_TABLE))
+        except TimeoutException:
+            return ItemsTable([])
+        rows = self.driver.execute_script(scripts.ITEMS_SNAPSHOT,
+                                          SettingsFoldersLocators.ITEM_ANY_TYPE[1],
+                                          SettingsFoldersLocators.ITEM_ANY_NAME[1],
+                                          SettingsFoldersLocators.ITEM_COLOR[1])
+        table = ItemsTable(ItemRow(**row) for row in rows or [])
+        for row in table:
+            self._cache.put((self.ROW, row.name), row)
+        logging.info('Items snapshot: %d items', len(table))
+        return table
+
+    def _cached_row(self, name):
+        """
+        row of item from element cache, located by find_item if not cached
         :param name: item name
-        :return: WebElement
+        :return: ItemRow or None
+        """
+        return self._cache.get((self.ROW, name), lambda: self.find_item(name))
+
+    def _checked_row(self, name):
+        """
+        row of item from element cache, checked in one call that it is still in table and shows the same item.
+        Color and index of row are read with the check. Row is located again if check fails
+        :param name: item name
+        :return: ItemRow or None
+        """
+        row = self._cached_row(name)
+        if row is None:
+            return None
+        try:
+            current = self.driver.execute_script(scripts.ITEM_ROW_CHECK, row.element, name,
+                                                 SettingsFoldersLocators.ITEM_ANY_TYPE[1],
+                                                 SettingsFoldersLocators.ITEM_ANY_NAME[1],
+                                                 SettingsFoldersLocators.ITEM_COLOR[1])
+        except StaleElementReferenceException:
+            current = None
+        if current:
+            row = ItemRow(**current)
+        else:
+            logging.info('Cached row of "%s" is outdated', name)
+            self._cache.invalidate(name)
+            row = self.find_item(name)
+        if row:
+            self._cache.put((self.ROW, name), row)
+        return row
+
+    def _use_row_child(self, name, locator, action):
+        """
+        Run action with cached child element of item row
+        :param name: item name
+        :param locator: child element locator
+        :param action: callable getting element
+        :return: result of action or None if item is not found
         """
-        all_items = self._get_all_items()
-        needed = None
-        for item in all_items:
-            name_found = False
+        def resolve():
+            row = self._cached_row(name)
+            if not row:
+                return None
             try:
-                name_found = item.find_element(SettingsFoldersLocators.ITEM_NAME[0],
-                                               SettingsFoldersLocators.ITEM_NAME[1].format(name))
-                logging.info(f'Find item by name: Found "{name_found.text}"')
-            except NoSuchElementException:
-                pass
-            if name_found:
-                needed = item
-                break
+                return row.element.find_element(*locator)
+            except StaleElementReferenceException:
+                # row is re-rendered, its children too
+                self._cache.invalidate(name)
+                row = self._cached_row(name)
+                return row.element.find_element(*locator) if row else None
+
+        return self._cache.use((locator, name), resolve, action)
+
+    def iter_items(self, chunk_size=None, settle_time=None):
+        """
+        Iterate over items lazily. Rows are fetched in chunks, table is scrolled
+        when all rendered rows are read, so lazily rendered rows are loaded too.
+        Items already read are skipped, e.g. if virtualized table re-renders rows above.
+        Stop iteration to stop fetching
+        :param chunk_size: rows per call, Config.ITEMS_CHUNK_SIZE by default
+        :param settle_time: seconds to wait for new rows after scrolls, in total for whole iteration.
+            Config.TABLE_SETTLE_TIME by default
+        :return: generator of ItemRow
+        """
+        chunk_size = chunk_size or Config.ITEMS_CHUNK_SIZE
+        settle_time = Config.TABLE_SETTLE_TIME if settle_time is None else settle_time
+        try:
+            table = waits.until(self.driver, waits.presence_of(SettingsFoldersLocators.ITEMS_TABLE))
+        except TimeoutException:
+            return
+        waits.set_script_timeout(self.driver, settle_time)
+        deadline = time.monotonic() + settle_time
+        cursor = None
+        seen = set()
+        while True:
+            remaining = max(0.0, deadline - time.monotonic())
+            rows = self.driver.execute_async_script(scripts.ITEMS_CHUNK, table,
+                                                    SettingsFoldersLocators.TABLE_ITEM_ANY_TYPE[1],
+                                                    SettingsFoldersLocators.ITEM_ANY_NAME[1],
+                                                    SettingsFoldersLocators.ITEM_COLOR[1],
+                                                    cursor.element if cursor else None,
+                                                    cursor.name if cursor else None,
+                                                    chunk_size, int(remaining * 1000))
+            if not rows:
+                return
+            for row in rows:
+                cursor = ItemRow(**row)
+                if cursor.name not in seen:
+                    seen.add(cursor.name)
+                    yield cursor
+
+    def find_item(self, name):
+        """
+        find item by name, rows after the match are not fetched
+        :param name: item name
+        :return: ItemRow or None
+        """
+        for row in self.iter_items():
+            if row.name == name:
+                return row
+        return None
 
-        return needed
+    def _find_item_by_name(self, name):
+        """
+        find item by name
+        :param name: item name
+        :return: WebElement
+        """
+        row = self._checked_row(name)
+        if row:
+            logging.info('Find item by name: Found "%s"', row.name)
+            return row.element
+        return None
 
     def _get_all_items(self):
         """
@@ -95,8 +315,7 @@ class SettingsFoldersPage(BasePage):
         :return: list of WebElement
         """
         try:
-            _ = WebDriverWait(self.driver, 5).until(EC.presence_of_element_located(
-                SettingsFoldersLocators.ITEMS_TABLE))
+            _ = waits.until(self.driver, waits.presence_of(SettingsFoldersLocators.ITEMS_TABLE))
             all_items = self.driver.find_elements(*SettingsFoldersLocators.ITEM_ANY_TYPE)
             return all_items
         except TimeoutException:
@@ -112,26 +331,16 @@ class SettingsFoldersPage(BasePage):
 
     def _get_item_index(self, name):
         """
-        get all items, find needed by name and return its index.
+        find item by name and return its index.
         used for checking items display
         :param name:
         :return:
         """
-        all_items = self._get_all_items()
-        index = None
-        for i, item in enumerate(all_items):
-            name_found = False
-            try:
-                name_found = item.find_element(SettingsFoldersLocators.ITEM_NAME[0],
-                                               SettingsFoldersLocators.ITEM_NAME[1].format(name))
-                logging.info(f'Get item index: Found "{name_found.text}". Index: {i}')
-            except NoSuchElementException:
-                pass
-            if name_found:
-                index = i
-                break
-
-        return index
+        row = self._checked_row(name)
+        if row:
+            logging.info('Get item index: Found "%s". Index: %s', row.name, row.index)
+            return row.index
+        return None
 
     def add_folder(self, name, color):
         return self._add_item(name, color, 'folder')
@@ -139,6 +348,7 @@ class SettingsFoldersPage(BasePage):
     def add_label(self, name, color):
         return self._add_item(name, color, 'label')
 
+    @profiled(navigation=False)
     def _add_item(self, name, color, item_type):
         """
         Add new folder
@@ -154,25 +364,29 @@ class SettingsFoldersPage(BasePage):
         else:
             raise Exception(f'_add_item: Unknown btn type "{item_type}"')
 
-        logging.info(f'Add item {item_type} {name} with color {color}')
+        logging.info('Add item %s %s with color %s', item_type, name, color)
         add_folder_btn = self.driver.find_element(*btn_locator)
         add_folder_btn.click()
-        logging.info(f'Click on Add Item btn: "{btn_locator}"')
+        logging.info('Click on Add Item btn: "%s"', btn_locator, extra={'locator': btn_locator})
 
         folder_name = self.driver.find_element(*SettingsModalDialogLocators.ITEM_NAME)
         folder_name.send_keys(name)
-        logging.info(f'Send "{name}" to item name: {SettingsModalDialogLocators.ITEM_NAME}')
+        logging.info('Send "%s" to item name: %s', name, SettingsModalDialogLocators.ITEM_NAME,
+                     extra={'locator': SettingsModalDialogLocators.ITEM_NAME})
 
         color_elem = self.driver.find_element(*color)
         color_elem.click()
-        logging.info(f'Click on color: "{color}"')
+        logging.info('Click on color: "%s"', color, extra={'locator': color})
 
         submit_btn = self.driver.find_element(*SettingsModalDialogLocators.SUBMIT)
         submit_btn.click()
-        logging.info(f'Click on Submit: "{SettingsModalDialogLocators.SUBMIT}"')
+        logging.info('Click on Submit: "%s"', SettingsModalDialogLocators.SUBMIT,
+                     extra={'locator': SettingsModalDialogLocators.SUBMIT})
+        self._table_changed()
 
         return True
 
+    @profiled(navigation=False)
     def edit_item(self, name, new_name, new_color):
         """
         Edit existing item
@@ -181,65 +395,173 @@ class SettingsFoldersPage(BasePage):
         :param new_color: new color
         :return: True in case of success
         """
-        item = self._find_item_by_name(name)
-        if item:
-            edit_btn = item.find_element(*SettingsFoldersLocators.EDIT_ITEM_BTN)
-            edit_btn.click()
-            logging.info(f'Click on Edit btn: {SettingsFoldersLocators.EDIT_ITEM_BTN}')
+        clicked = self._use_row_child(name, SettingsFoldersLocators.EDIT_ITEM_BTN, lambda btn: btn.click() or True)
+        if clicked:
+            logging.info('Click on Edit btn: %s', SettingsFoldersLocators.EDIT_ITEM_BTN,
+                         extra={'locator': SettingsFoldersLocators.EDIT_ITEM_BTN})
 
             folder_name = self.driver.find_element(*SettingsModalDialogLocators.ITEM_NAME)
             folder_name.click()
             # select all by Ctrl+A, backspace
             ActionChains(self.driver).key_down(Keys.CONTROL).send_keys('a').key_up(Keys.CONTROL).perform()
             folder_name.send_keys(Keys.BACKSPACE)
-            logging.info(f'Send "{name}" to folder name: {SettingsModalDialogLocators.ITEM_NAME}')
+            logging.info('Send "%s" to folder name: %s', name, SettingsModalDialogLocators.ITEM_NAME,
+                         extra={'locator': SettingsModalDialogLocators.ITEM_NAME})
             folder_name.send_keys(new_name)
 
             color_elem = self.driver.find_element(*new_color)
             color_elem.click()
-            logging.info(f'Click on color: "{new_color}"')
+            logging.info('Click on color: "%s"', new_color, extra={'locator': new_color})
 
             submit_btn = self.driver.find_element(*SettingsModalDialogLocators.SUBMIT)
             submit_btn.click()
-            logging.info(f'Click on Submit: "{SettingsModalDialogLocators.SUBMIT}"')
+            logging.info('Click on Submit: "%s"', SettingsModalDialogLocators.SUBMIT,
+                         extra={'locator': SettingsModalDialogLocators.SUBMIT})
+            self._table_changed()
             return True
 
+    @profiled(navigation=False)
     def delete_item(self, name):
         """
         Deelte existing item
         :param name: name of item to delete
         :return: True in case of success
         """
-        item = self._find_item_by_name(name)
-
-        if item:
-            dropdown_btn = item.find_element(*SettingsFoldersLocators.DROPDOWN_OPEN_BTN)
-            dropdown_btn.click()
-            logging.info(f'Click on Dropdown btn: "{SettingsFoldersLocators.DROPDOWN_OPEN_BTN}"')
+        clicked = self._use_row_child(name, SettingsFoldersLocators.DROPDOWN_OPEN_BTN,
+                                      lambda btn: btn.click() or True)
+        if not clicked:
+            logging.warning('Cannot find item "%s"', name)
+            return False
+        logging.info('Click on Dropdown btn: "%s"', SettingsFoldersLocators.DROPDOWN_OPEN_BTN,
+                     extra={'locator': SettingsFoldersLocators.DROPDOWN_OPEN_BTN})
 
-        item_index = self._get_item_index(name)
-        # can return 0, so need to compare with None
-        # noinspection PyComparisonWithNone
-        if item_index is None:
-            logging.warning(f'Cannot get item index for "{name}"')
+        if not self._click_delete_button(name):
+            logging.warning('Cannot get "delete" button of "%s"', name)
             return False
-        # get all delete buttons
-        delete_buttons = self.driver.find_elements(*SettingsFoldersLocators.DELETE_ITEM_BTN)
-        if delete_buttons:
-            # click on Delete button for needed item
-            delete_buttons[item_index].click()
-            logging.info(f'Click on Delete btn: "{SettingsFoldersLocators.DELETE_ITEM_BTN}"')
+        logging.info('Click on Delete btn: "%s"', SettingsFoldersLocators.DELETE_ITEM_BTN,
+                     extra={'locator': SettingsFoldersLocators.DELETE_ITEM_BTN})
 
-            submit_btn = WebDriverWait(self.driver, 5).until(
-                EC.element_to_be_clickable(SettingsModalDialogLocators.SUBMIT))
+        submit_btn = waits.until(self.driver, waits.clickable(SettingsModalDialogLocators.SUBMIT))
+        submit_btn.click()
+        logging.info('Click on Submit btn: "%s"', SettingsModalDialogLocators.SUBMIT,
+                     extra={'locator': SettingsModalDialogLocators.SUBMIT})
+        self._table_changed()
+        return True
 
-            submit_btn.click()
-            logging.info(f'Click on Submit btn: "{SettingsModalDialogLocators.SUBMIT}"')
-            return True
+    def _table_changed(self):
+        # during bulk operation cached rows are re-located only if they become stale,
+        # table is checked once at the end
+        if not self._bulk:
+            self._cache.invalidate()
 
-        else:
-            logging.warning('Cannot get "delete" buttons')
-            return False
+    def _click_delete_button(self, name):
+        """
+        Click Delete button of item. Button is looked up in item row first,
+        if dropdown is rendered outside of row - button of the same position as row is clicked
+        :param name: item name
+        :return: True if clicked
+        """
+        try:
+            if self._use_row_child(name, SettingsFoldersLocators.DELETE_ITEM_BTN, lambda btn: btn.click() or True):
+                return True
+        except NoSuchElementException:
+            pass
+        for _ in range(2):
+            row = self._cached_row(name)
+            if not row:
+                return False
+            try:
+                if self.driver.execute_script(scripts.CLICK_ROW_DELETE, row.element, name,
+                                              SettingsFoldersLocators.ITEM_ANY_TYPE[1],
+                                              SettingsFoldersLocators.ITEM_ANY_NAME[1],
+                                              SettingsFoldersLocators.DELETE_ITEM_BTN[1]):
+                    return True
+            except StaleElementReferenceException:
+                pass
+            # row is re-rendered or shows another item now
+            self._cache.invalidate(name)
+        return False
+
+    def add_items(self, items, timeout=5):
+        """
+        Add many items. Dialogs are submitted one by one without waiting for notifications
+        and table updates, notifications and table are checked all together at the end
+        :param items: list of tuples (name, color, item_type), item_type is 'folder' or 'label'
+        :param timeout: seconds to wait for notifications after last item is submitted
+        :return: BulkReport
+        """
+        steps = [(name, f'{name} created', name, self._add_item, (name, color, item_type))
+                 for name, color, item_type in items]
+        return self._run_bulk('add_items', steps, timeout, present=True, existing=False)
+
+    def edit_items(self, items, timeout=5):
+        """
+        Edit many items, see add_items
+        :param items: list of tuples (name, new_name, new_color)
+        :param timeout: seconds to wait for notifications after last item is submitted
+        :return: BulkReport
+        """
+        steps = [(name, f'{new_name} updated', new_name, self.edit_item, (name, new_name, new_color))
+                 for name, new_name, new_color in items]
+        return self._run_bulk('edit_items', steps, timeout, present=True, existing=True)
+
+    def delete_items(self, names, timeout=5):
+        """
+        Delete many items, see add_items
+        :param names: list of item names
+        :param timeout: seconds to wait for notifications after last item is submitted
+        :return: BulkReport
+        """
+        steps = [(name, f'{name} removed', name, self.delete_item, (name,)) for name in names]
+        return self._run_bulk('delete_items', steps, timeout, present=False, existing=True)
+
+    def _run_bulk(self, operation, steps, timeout, present, existing):
+        """
+        Perform all actions without waiting for their results, then wait for all notifications
+        and take one snapshot of table. Only closing of dialog is waited between actions,
+        as next dialog cannot be opened before
+        :param operation: operation name for report
+        :param steps: list of tuples (name, notification text, name to check in table, action, action args)
+        :param timeout: seconds to wait for notifications after last action
+        :param present: True if checked names should be in table after operation
+        :param existing: True if actions use rows of existing items, they are located with one snapshot
+        :return: BulkReport
+        """
+        report = BulkReport(operation)
+        submitted = []
+        if existing:
+            self.get_items_snapshot()
+        self._bulk = True
+        try:
+            for name, _, _, action, args in steps:
+                try:
+                    submitted.append(bool(action(*args)))
+                except WebDriverException as exc:
+                    logging.warning('%s: "%s" failed: %s', operation, name, exc.msg)
+                    submitted.append(False)
+                    self.close_modal_dialog()
+                self._wait_modal_closed()
+        finally:
+            self._bulk = False
+            self._cache.invalidate()
+
+        texts = [step[1] for step, done in zip(steps, submitted) if done]
+        waits.set_script_timeout(self.driver, timeout)
+        notified = self.driver.execute_async_script(scripts.NOTIFICATIONS_TAKE_ALL, texts, 'notification-success',
+                                                    int(timeout * 1000))
+        table = self.get_items_snapshot()
+        for (name, text, check_name, _, _), done in zip(steps, submitted):
+            report.results.append(ItemResult(name, done, text in notified, (check_name in table) == present))
+
+        report.finish()
+        logging.info('Bulk %s', report, extra={'duration': report.elapsed})
+        return report
+
+    def _wait_modal_closed(self, timeout=None):
+        try:
+            waits.until(self.driver, waits.absence_of(SettingsModalDialogLocators.HEADER), timeout)
+        except TimeoutException:
+            self.close_modal_dialog()
 
     def close_modal_dialog(self):
         """
@@ -252,37 +574,70 @@ class SettingsFoldersPage(BasePage):
                 close_btn = self.driver.find_element(*SettingsModalDialogLocators.CANCEL)
                 close_btn.click()
                 # warning level is because we should not have dialog opened
-                logging.warning(f'Close modal dialog. Click on "{SettingsModalDialogLocators.CANCEL}"')
+                logging.warning('Close modal dialog. Click on "%s"', SettingsModalDialogLocators.CANCEL,
+                                extra={'locator': SettingsModalDialogLocators.CANCEL})
         except NoSuchElementException:
             logging.info('Not found modal dialog')
 
-    def success_notification_appeared(self, text, timeout=5):
+    def success_notification_appeared(self, text, timeout=None):
         """
-        Check if Success notification appeared after performing some of actions
+        Check if Success notification appeared after performing some of actions.
+        Notifications recorded in page are checked first, so it is instant
+        if notification already appeared (even if it is already hidden)
         :param text: Text of notification
-        :param timeout:
+        :param timeout: seconds. By default - learned from latency history
         :return: True in case of success
         """
-        appeared = False
+        locator = (SettingsFoldersLocators.NOTIFICATION_SUCCESS[0],
+                   SettingsFoldersLocators.NOTIFICATION_SUCCESS[1].format(text))
+        site = 'success_notification_appeared'
+        adaptive = timeout is None
+        if adaptive:
+            timeout = timeouts.policy.timeout(site, waits.DEFAULT_TIMEOUT)
+        logging.info('Wait %s for "%s"', timeout, locator, extra={'locator': locator})
+        waits.set_script_timeout(self.driver, timeout)
+        started = time.monotonic()
         try:
-            wait = WebDriverWait(self.driver, timeout)
-            locator = (SettingsFoldersLocators.NOTIFICATION_SUCCESS[0],
-                       SettingsFoldersLocators.NOTIFICATION_SUCCESS[1].format(text))
-            logging.info(f'Wait {timeout} for "{locator}"')
-            appeared = wait.until(EC.presence_of_element_located(locator))
-        except TimeoutException:
-            logging.warning(f'Timeout exception during wait of "{text}"')
+            appeared = self.driver.execute_async_script(scripts.NOTIFICATIONS_TAKE, text, 'notification-success',
+                                                        locator[1], int(timeout * 1000))
+        except WebDriverException as exc:
+            # e.g. page reloaded during wait, recorder is lost - wait for notification in DOM
+            logging.warning('Cannot read notifications: %s', exc.msg)
+            appeared = self._notification_in_dom(text, locator, started + timeout - time.monotonic())
+        elapsed = time.monotonic() - started
+        if appeared:
+            timeouts.policy.observe(site, elapsed)
+        if not appeared:
+            logging.warning('Timeout exception during wait of "%s"', text, extra={'duration': elapsed})
+        else:
+            logging.info('Notification "%s" appeared', text, extra={'duration': elapsed})
+            if profiler.enabled:
+                profiler.record('submit_to_notification', appeared.get('since_submit'))
 
         return True if appeared else False
 
+    def _notification_in_dom(self, text, locator, timeout):
+        """
+        Wait for notification element, recorder is installed again for next waits
+        :return: notification entry like NOTIFICATIONS_TAKE or None
+        """
+        try:
+            waits.until(self.driver, waits.presence_of(locator), timeout=max(timeout, 0.1))
+        except WebDriverException:
+            return None
+        try:
+            self.install_notification_recorder()
+        except WebDriverException:
+            pass
+        return {'text': text, 'since_submit': None}
+
     def item_is_displayed(self, name):
         """
         CHeck if item with specified name can be located
         :param name: item name
         :return:
         """
-        item = self._find_item_by_name(name)
-        return True if item else False
+        return name in self.get_items_snapshot()
 
     def item_color_is_correct(self, name, color):
         """
@@ -291,11 +646,36 @@ class SettingsFoldersPage(BasePage):
         :param color: expected item color
         :return: True in case of success
         """
-        item = self._find_item_by_name(name)
-        if item:
-            item_color = item.find_element(*SettingsFoldersLocators.ITEM_COLOR).get_attribute('style')
-            logging.info(f'Item {name} color is "{item_color}". Should be "{color}"')
-            if item_color == color:
+        # color is read again with check of cached row, one round trip
+        row = self._checked_row(name)
+        item_color = row.color if row else None
+        if item_color is not None:
+            logging.info('Item %s color is "%s". Should be "%s"', name, item_color, color)
+            expected = colors.normalize(color)
+            # unknown expected or rendered color is a mismatch, not None == None
+            if expected is not None and colors.normalize(item_color) == expected:
                 return True
             else:
                 return False
+
+    def verify_colors(self, expected):
+        """
+        Check colors of many items with one script call
+        :param expected: dict {item name: color}, color in any form supported by colors.normalize
+        :return: ColorDiff
+        """
+        found = self.driver.execute_script(scripts.ITEMS_COLORS, list(expected),
+                                           SettingsFoldersLocators.ITEM_ANY_TYPE[1],
+                                           SettingsFoldersLocators.ITEM_ANY_NAME[1],
+                                           SettingsFoldersLocators.ITEM_COLOR[1])
+        checks = []
+        for name, color in expected.items():
+            expected_rgb = colors.normalize(color)
+            rendered = found.get(name)
+            # inline style is what is set by app, computed - if color comes from css
+            actual = (colors.normalize(rendered['inline']) or colors.normalize(rendered['computed'])
+                      if rendered else None)
+            checks.append(colors.ColorCheck(name, expected_rgb, actual, actual is not None and actual == expected_rgb))
+        diff = colors.ColorDiff(checks)
+        logging.info('Verify colors: %s', diff)
+        return diff
@@ -0,0 +1,228 @@
+import queue
+import logging
+import threading
+from contextlib import contextmanager
+
+from selenium.common.exceptions import WebDriverException
+
+from .browser import create_driver
+from .config import Config
+from .health import monitor
+from .pages import LoginPage, SettingsFoldersPage
+
+
+class PoolError(Exception):
+    pass
+
+
+def start_browser():
+    """
+    Open browser, login, go to Settings Folder/Labels page
+    :return: selenium.webdriver
+    """
+    driver = create_driver()
+    logging.info('Webdriver initialized')
+    if not LoginPage(driver).login_with_session():
+        driver.quit()
+        raise PoolError('Failed to log in')
+    # restored session is already checked on settings page
+    if driver.title != SettingsFoldersPage.TITLE:
+        SettingsFoldersPage(driver).go_to_settings_page()
+    return driver
+
+
+class BrowserPool:
+    """
+    Keeps logged in browsers opened on Settings Folder/Labels page.
+    Browsers are started in background threads, tests lease them and return back
+    """
+
+    def __init__(self, size=None, max_leases=None, factory=start_browser):
+        self.size = size or Config.POOL_SIZE
+        self.max_leases = max_leases or Config.POOL_MAX_LEASES
+        self.factory = factory
+        # contains drivers or exceptions raised during start
+        self._idle = queue.Queue()
+        # driver -> number of leases, guarded by self._lock
+        self._leases = {}
+        # drivers given out by acquire and not released yet
+        self._leased = set()
+        self._threads = []
+        self._started = False
+        # incremented by cancel, browsers of previous generation are quit when started
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def prewarm(self):
+        """
+        Start browsers in background. Does nothing if already started
+        :return: None
+        """
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        logging.info(f'Browser pool: starting {self.size} browsers')
+        for _ in range(self.size):
+            self._launch()
+
+    def cancel(self):
+        """
+        Stop prewarm, e.g. when no collected test needs browser. Does not wait for browsers being started,
+        they are quit as soon as started. Started browsers are quit now
+        :return: None
+        """
+        with self._lock:
+            self._generation += 1
+            self._threads = []
+            self._started = False
+        logging.info('Browser pool: prewarm cancelled')
+        self._quit_idle()
+
+    def _launch(self):
+        with self._lock:
+            thread = threading.Thread(target=self._start_browser, args=(self._generation,), daemon=True)
+            self._threads.append(thread)
+        thread.start()
+
+    def _start_browser(self, generation):
+        try:
+            driver = self.factory()
+        except Exception as exc:
+            logging.warning(f'Browser pool: failed to start browser: {exc}')
+            with self._lock:
+                if generation == self._generation:
+                    self._idle.put(exc)
+            return
+        with self._lock:
+            if generation == self._generation:
+                self._leases[driver] = 0
+                self._idle.put(driver)
+                return
+        _quit(driver)
+
+    def acquire(self, timeout=None):
+        """
+        Get logged in browser. Waits if all browsers are leased or starting
+        :param timeout: seconds, Config.POOL_LEASE_TIMEOUT by default
+        :return: selenium.webdriver
+        """
+        self.prewarm()
+        try:
+            item = self._idle.get(timeout=timeout or Config.POOL_LEASE_TIMEOUT)
+        except queue.Empty:
+            raise PoolError('Timeout during wait of free browser')
+        if isinstance(item, Exception):
+            # try again for next lease
+            self._launch()
+            raise PoolError(f'Failed to start browser: {item}')
+        with self._lock:
+            self._leased.add(item)
+        return item
+
+    def release(self, driver, healthy=True):
+        """
+        Return browser to pool. Browser is reset to Settings Folder/Labels page
+        or restarted if it is unhealthy, crossed health thresholds (see health.HealthMonitor)
+        or leased too many times
+        :param driver: selenium.webdriver
+        :param healthy: False if browser should be restarted, e.g. test failed with WebDriverException
+        :return: None
+        """
+        with self._lock:
+            self._leased.discard(driver)
+            leases = self._leases[driver] = self._leases.get(driver, 0) + 1
+        if healthy and leases < self.max_leases:
+            try:
+                self.reset(driver)
+                # sampled after reset, it is state next test gets
+                if not Config.HEALTH_CHECK or monitor.check(driver, leases):
+                    self._idle.put(driver)
+                    return
+            except WebDriverException as exc:
+                logging.warning(f'Browser pool: reset failed: {exc}')
+        self.recycle(driver)
+
+    @staticmethod
+    def reset(driver):
+        settings_page = SettingsFoldersPage(driver)
+        settings_page.close_modal_dialog()
+        settings_page.go_to_settings_page()
+
+    def recycle(self, driver):
+        """
+        Quit browser and start new one in background
+        :param driver: selenium.webdriver
+        :return: None
+        """
+        with self._lock:
+            leases = self._leases.pop(driver, 0)
+        logging.info(f'Browser pool: recycle browser after {leases} leases')
+        _quit(driver)
+        self._launch()
+
+    @contextmanager
+    def lease(self):
+        driver = self.acquire()
+        healthy = False
+        try:
+            yield driver
+            healthy = True
+        except WebDriverException:
+            raise
+        except Exception:
+            # browser itself is fine
+            healthy = True
+            raise
+        finally:
+            self.release(driver, healthy)
+
+    def close(self):
+        """
+        Quit all browsers of pool, including leased ones
+        :return: None
+        """
+        with self._lock:
+            threads = list(self._threads)
+        for thread in threads:
+            thread.join()
+        self._quit_idle()
+        with self._lock:
+            leased = list(self._leased)
+            self._leased.clear()
+            self._leases.clear()
+            self._threads = []
+            self._started = False
+        for driver in leased:
+            logging.warning('Browser pool: quit browser which is still leased')
+            _quit(driver)
+
+
+    def _quit_idle(self):
+        while not self._idle.empty():
+            item = self._idle.get_nowait()
+            if not isinstance(item, Exception):
+                with self._lock:
+                    self._leases.pop(item, None)
+                _quit(item)
+
+
+def _quit(driver):
+    try:
+        driver.quit()
+    except WebDriverException:
+        pass
+
+
+_pool = None
+
+
+def get_pool():
+    """
+    Browser pool of current process (pytest-xdist worker)
+    :return: BrowserPool
+    """
+    global _pool
+    if _pool is None:
+        _pool = BrowserPool()
+    return _pool
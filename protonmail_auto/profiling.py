@@ -0,0 +1,129 @@
+"""
+Opt-in profiling of ProtonMail pages: navigation timing, long tasks, JS heap size
+and time from Submit click to success notification, stored as time series per test
+"""
+import os
+import json
+import time
+import logging
+import functools
+import statistics
+from collections import defaultdict
+
+from selenium.common.exceptions import WebDriverException
+
+from . import scripts
+from .config import Config
+from .context import current_test
+
+# allowed growth of metric against median of previous runs
+REGRESSION_THRESHOLD = 0.3
+# runs kept in history
+HISTORY_SIZE = 20
+
+
+class PageProfiler:
+    def __init__(self):
+        self.enabled = False
+        # test -> metric -> list of values of current run
+        self.samples = defaultdict(lambda: defaultdict(list))
+
+    def install(self, driver):
+        """
+        Enable DevTools metrics and long tasks observer. Does nothing if profiler is disabled,
+        driver is not Chrome or it is already installed
+        :param driver: selenium.webdriver
+        :return: None
+        """
+        if not self.enabled or getattr(driver, '_profiled', False) or not hasattr(driver, 'execute_cdp_cmd'):
+            return
+        driver.execute_cdp_cmd('Performance.enable', {})
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': scripts.LONG_TASKS_OBSERVER})
+        driver._profiled = True
+
+    def record(self, metric, value):
+        if value is not None:
+            self.samples[current_test()][metric].append(value)
+
+    def collect(self, driver, method, navigation):
+        """
+        Record page metrics after page object method
+        :param driver: selenium.webdriver
+        :param method: page object method name
+        :param navigation: True if method loaded new document
+        :return: None
+        """
+        try:
+            page = driver.execute_script(scripts.PAGE_PERFORMANCE, navigation)
+            metrics = {m['name']: m['value'] for m in driver.execute_cdp_cmd('Performance.getMetrics', {})['metrics']}
+        except (WebDriverException, AttributeError) as exc:
+            logging.warning(f'Profiling: cannot collect metrics after {method}: {exc}')
+            return
+        for name, value in page.items():
+            self.record(f'{method}.{name}', value)
+        self.record(f'{method}.js_heap', metrics.get('JSHeapUsedSize'))
+        self.record(f'{method}.dom_nodes', metrics.get('Nodes'))
+
+    def summary(self):
+        """
+        median of every metric of current run
+        :return: dict {test: {metric: value}}
+        """
+        return {test: {metric: statistics.median(values) for metric, values in metrics.items()}
+                for test, metrics in self.samples.items()}
+
+    def save(self, path):
+        """
+        Append summary of current run to history and compare with previous runs
+        :param path: history json file
+        :return: list of strings describing regressions
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as r_file:
+                history = json.load(r_file)
+        except (FileNotFoundError, json.decoder.JSONDecodeError):
+            history = {}
+
+        regressions = []
+        run = time.time()
+        for test, metrics in self.summary().items():
+            test_history = history.setdefault(str(test), {})
+            for metric, value in metrics.items():
+                series = test_history.setdefault(metric, [])
+                previous = [point['value'] for point in series]
+                if previous:
+                    base = statistics.median(previous)
+                    if base and value > base * (1 + REGRESSION_THRESHOLD):
+                        regressions.append(f'{test} {metric}: {value:.1f}, previous median {base:.1f}')
+                series.append({'run': run, 'value': value})
+                del series[:-HISTORY_SIZE]
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as w_file:
+            json.dump(history, w_file, indent=2)
+        return regressions
+
+
+profiler = PageProfiler()
+
+
+def profiled(navigation=False):
+    """
+    Decorator for page object methods: collect page metrics after method if profiler is enabled
+    :param navigation: method loads new document
+    """
+    def decorator(func):
+        # not "self", so instrumentation attributes commands to decorated method, not to wrapper
+        @functools.wraps(func)
+        def wrapper(page, *args, **kwargs):
+            result = func(page, *args, **kwargs)
+            if profiler.enabled:
+                profiler.collect(page.driver, f'{type(page).__name__}.{func.__name__}', navigation)
+            return result
+        return wrapper
+    return decorator
+
+
+def history_path(worker='master'):
+    name = 'profile_history.json' if worker == 'master' else f'profile_history_{worker}.json'
+    return os.path.join(Config.DATA_DIR, name)
@@ -0,0 +1,130 @@
+"""
+Dependencies of tests on state made by other tests.
+Tests declare @pytest.mark.state(produces='folder1', consumes='...'),
+independent chains get own pytest-xdist group (run on separate workers and browsers with --dist loadgroup),
+steps of chain run in order, consumers of failed producer are skipped without running
+"""
+import logging
+
+MARKER = 'state'
+
+
+class SchedulerError(Exception):
+    pass
+
+
+def _states(marker, name):
+    value = marker.kwargs.get(name, ()) if marker else ()
+    return (value,) if isinstance(value, str) else tuple(value)
+
+
+class StateGraph:
+    def __init__(self, items):
+        """
+        :param items: pytest items in collection order
+        """
+        self.items = list(items)
+        # state -> nodeid of producer
+        self.producers = {}
+        # nodeid -> nodeids of producers of consumed states
+        self.requires = {}
+        for item in self.items:
+            for state in _states(item.get_closest_marker(MARKER), 'produces'):
+                if state in self.producers:
+                    raise SchedulerError(f'State "{state}" is produced by {self.producers[state]} and {item.nodeid}')
+                self.producers[state] = item.nodeid
+        for item in self.items:
+            requires = set()
+            for state in _states(item.get_closest_marker(MARKER), 'consumes'):
+                if state in self.producers:
+                    requires.add(self.producers[state])
+                else:
+                    logging.info('%s consumes "%s", it is not produced by tests', item.nodeid, state)
+            requires.discard(item.nodeid)
+            self.requires[item.nodeid] = requires
+
+    def order(self):
+        """
+        Producers before consumers, otherwise collection order is kept
+        :return: list of pytest items
+        """
+        done, ordered, pending = set(), [], list(self.items)
+        while pending:
+            ready = [item for item in pending if self.requires[item.nodeid] <= done]
+            if not ready:
+                raise SchedulerError(f'Dependency cycle: {", ".join(item.nodeid for item in pending)}')
+            # first ready item only, so independent items keep their relative order
+            item = ready[0]
+            pending.remove(item)
+            ordered.append(item)
+            done.add(item.nodeid)
+        return ordered
+
+    def chains(self):
+        """
+        Connected tests, only tests with dependencies are included
+        :return: dict nodeid -> chain name (name of first test of chain)
+        """
+        parent = {}
+
+        def root(nodeid):
+            while parent.get(nodeid, nodeid) != nodeid:
+                nodeid = parent[nodeid]
+            return nodeid
+
+        for nodeid, requires in self.requires.items():
+            for required in requires:
+                parent[root(nodeid)] = root(required)
+        first_names = {item.nodeid: getattr(item, 'originalname', item.name) for item in self.items}
+        return {nodeid: f'chain-{first_names[root(nodeid)]}' for nodeid in self.requires
+                if nodeid in parent or nodeid in parent.values()}
+
+
+class Scheduler:
+    def __init__(self):
+        self.graph = None
+        # nodeids of failed or skipped tests
+        self.failed = set()
+        # pytest-xdist adds group to nodeid after collection, current nodeid -> nodeid in graph
+        self._keys = {}
+
+    def modify_items(self, items, add_marker):
+        """
+        Reorder items in place, put each chain to own xdist_group
+        :param items: pytest items
+        :param add_marker: callable(item, chain name)
+        :return: None
+        """
+        self.graph = StateGraph(items)
+        items[:] = self.graph.order()
+        chains = self.graph.chains()
+        for item in items:
+            item._state_key = item.nodeid
+            chain = chains.get(item.nodeid)
+            if chain and not item.get_closest_marker('xdist_group'):
+                add_marker(item, chain)
+
+    def skip_reason(self, item):
+        """
+        :return: reason to skip item if its producer failed, else None
+        """
+        if not self.graph:
+            return None
+        key = getattr(item, '_state_key', item.nodeid)
+        self._keys[item.nodeid] = key
+        failed = sorted(self.graph.requires.get(key, set()) & self.failed)
+        if failed:
+            return f'producer failed: {", ".join(failed)}'
+        return None
+
+    def record(self, report):
+        """
+        Remember outcome of test phase
+        :param report: pytest TestReport
+        :return: None
+        """
+        if report.failed or (report.skipped and report.when in ('setup', 'call')):
+            self.failed.add(self._keys.get(report.nodeid, report.nodeid))
+
+
+scheduler = Scheduler()
@@ -0,0 +1,409 @@
+"""
+JavaScript snippets executed in the browser through driver.execute_script
+"""
+
+# Record of Folders/labels table row, used by items scripts
+_ITEM_RECORD = """
+function itemRecord(row, index, nameXpath, colorXpath) {
+    var name = document.evaluate(nameXpath, row, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    var color = document.evaluate(colorXpath, row, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    var testId = row.getAttribute('data-test-id') || '';
+    return {
+        element: row,
+        index: index,
+        name: name ? name.textContent : null,
+        item_type: testId.split(':').pop(),
+        color: color ? color.getAttribute('style') : null
+    };
+}
+"""
+
+# Collect all rows of Folders/labels table in one call.
+# arguments: rows xpath, item name xpath, item color xpath
+ITEMS_SNAPSHOT = _ITEM_RECORD + """
+var rowsXpath = arguments[0], nameXpath = arguments[1], colorXpath = arguments[2];
+var rows = document.evaluate(rowsXpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+var result = [];
+for (var i = 0; i < rows.snapshotLength; i++) {
+    result.push(itemRecord(rows.snapshotItem(i), i, nameXpath, colorXpath));
+}
+return result;
+"""
+
+# Collect chunk of rows of Folders/labels table after cursor row.
+# Rows are evaluated relative to table once and kept on table element, next chunks are read from this list.
+# Table is evaluated again only when the list is exhausted or its rows are removed from document:
+# then the table is scrolled to the last row and lazily rendered rows are waited for at most settle time.
+# Position is found by cursor row, not by offset, so rows removed by virtualized table do not shift it.
+# arguments: table element, rows xpath relative to table, item name xpath, item color xpath,
+#            cursor row element and item name or nulls for first chunk, limit, settle time in ms, async callback
+# result: list of row records, empty at the end of table
+ITEMS_CHUNK = _ITEM_RECORD + """
+var table = arguments[0], rowsXpath = arguments[1], nameXpath = arguments[2], colorXpath = arguments[3];
+var cursor = arguments[4], cursorName = arguments[5], limit = arguments[6], settleMs = arguments[7];
+var done = arguments[arguments.length - 1];
+function evaluate() {
+    var snapshot = document.evaluate(rowsXpath, table, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    var rows = [];
+    for (var i = 0; i < snapshot.snapshotLength; i++) {
+        rows.push(snapshot.snapshotItem(i));
+    }
+    table.__qaItemRows = rows;
+    return rows;
+}
+function nameOf(row) {
+    var name = document.evaluate(nameXpath, row, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    return name ? name.textContent : null;
+}
+function start(rows) {
+    // position after cursor row; cursor element can be reused by virtualized table for another item
+    if (!cursor) {
+        return 0;
+    }
+    var index = rows.indexOf(cursor);
+    if (index < 0 || nameOf(cursor) !== cursorName) {
+        index = -1;
+        for (var i = 0; i < rows.length && index < 0; i++) {
+            if (nameOf(rows[i]) === cursorName) {
+                index = i;
+            }
+        }
+    }
+    // cursor row is gone, start from the top, caller skips items already read
+    return index + 1;
+}
+function collect(rows, from) {
+    var result = [];
+    for (var i = from; i < Math.min(rows.length, from + limit); i++) {
+        result.push(itemRecord(rows[i], i, nameXpath, colorXpath));
+    }
+    return result;
+}
+var rows = cursor && table.__qaItemRows ? table.__qaItemRows : evaluate();
+var from = start(rows);
+if (from < rows.length && rows[from].isConnected) {
+    done(collect(rows, from));
+    return;
+}
+rows = evaluate();
+from = start(rows);
+if (from < rows.length || settleMs <= 0) {
+    done(collect(rows, from));
+    return;
+}
+if (rows.length) {
+    rows[rows.length - 1].scrollIntoView({block: 'end'});
+}
+var timer = null;
+var observer = new MutationObserver(function () {
+    var current = evaluate();
+    var position = start(current);
+    if (position < current.length) {
+        observer.disconnect();
+        clearTimeout(timer);
+        done(collect(current, position));
+    }
+});
+observer.observe(table, {childList: true, subtree: true});
+timer = setTimeout(function () {
+    observer.disconnect();
+    var current = evaluate();
+    done(collect(current, start(current)));
+}, settleMs);
+"""
+
+# Check cached row: still in document and shows the same item. Record is read again in the same call,
+# so color and position are current.
+# arguments: row element, item name, rows xpath, item name xpath, item color xpath
+# result: row record or null if row is detached or shows another item
+ITEM_ROW_CHECK = _ITEM_RECORD + """
+var row = arguments[0], name = arguments[1], rowsXpath = arguments[2];
+if (!row.isConnected) return null;
+var rows = document.evaluate(rowsXpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+for (var i = 0; i < rows.snapshotLength; i++) {
+    if (rows.snapshotItem(i) === row) {
+        var record = itemRecord(row, i, arguments[3], arguments[4]);
+        return record.name === name ? record : null;
+    }
+}
+return null;
+"""
+
+# Click Delete button of item when Delete buttons of dropdowns are rendered outside of rows.
+# Position of row is found and button is clicked in one call, so removal or insertion
+# of other rows cannot shift the index in between.
+# arguments: row element, item name, rows xpath, item name xpath, delete buttons xpath
+# result: true if clicked, false if row is not in table or shows another item
+CLICK_ROW_DELETE = """
+var row = arguments[0], name = arguments[1];
+var nameNode = document.evaluate(arguments[3], row, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (!nameNode || nameNode.textContent !== name) return false;
+var rows = document.evaluate(arguments[2], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+var index = -1;
+for (var i = 0; i < rows.snapshotLength; i++) {
+    if (rows.snapshotItem(i) === row) {
+        index = i;
+        break;
+    }
+}
+var buttons = document.evaluate(arguments[4], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+if (index === -1 || index >= buttons.snapshotLength) return false;
+buttons.snapshotItem(index).click();
+return true;
+"""
+
+# Dump localStorage and sessionStorage of current origin
+STORAGE_DUMP = """
+function dump(storage) {
+    var data = {};
+    for (var i = 0; i < storage.length; i++) {
+        var key = storage.key(i);
+        data[key] = storage.getItem(key);
+    }
+    return data;
+}
+return {local: dump(window.localStorage), session: dump(window.sessionStorage)};
+"""
+
+# Restore localStorage and sessionStorage of current origin.
+# arguments: dict returned by STORAGE_DUMP
+STORAGE_RESTORE = """
+var data = arguments[0];
+Object.keys(data.local || {}).forEach(function (key) { window.localStorage.setItem(key, data.local[key]); });
+Object.keys(data.session || {}).forEach(function (key) { window.sessionStorage.setItem(key, data.session[key]); });
+"""
+
+# Wait until one of conditions is satisfied, checks are triggered by DOM mutations
+# (title changes are mutations of <title> too).
+# arguments: list of conditions {name, kind, value}, timeout in ms, async callback
+# result: {name, element} of first satisfied condition or null on timeout
+WAIT_FOR_ANY = """
+var conditions = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+function find(xpath) {
+    return document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+function visible(node) {
+    return node.getClientRects().length > 0 && window.getComputedStyle(node).visibility !== 'hidden';
+}
+function check() {
+    for (var i = 0; i < conditions.length; i++) {
+        var c = conditions[i], node = null;
+        if (c.kind === 'title_is' && document.title === c.value) return {name: c.name, element: null};
+        if (c.kind === 'title_contains' && document.title.indexOf(c.value) !== -1) return {name: c.name, element: null};
+        if (c.kind === 'absence' && !find(c.value)) return {name: c.name, element: null};
+        if (c.kind === 'presence' || c.kind === 'clickable') node = find(c.value);
+        if (node && (c.kind === 'presence' || (visible(node) && !node.disabled))) return {name: c.name, element: node};
+    }
+    return null;
+}
+var found = check();
+if (found) {
+    done(found);
+    return;
+}
+var timer = null;
+var observer = new MutationObserver(function () {
+    var found = check();
+    if (found) {
+        observer.disconnect();
+        clearTimeout(timer);
+        done(found);
+    }
+});
+observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+timer = setTimeout(function () {
+    observer.disconnect();
+    done(null);
+}, timeoutMs);
+"""
+
+# Recorder of notifications. Installed once per page load, buffers every added
+# notification element, so transient notification can be checked after it disappeared
+_NOTIFICATIONS_RECORDER = """
+if (!window.__pmNotifications) {
+    window.__pmNotifications = [];
+    window.__pmNotificationListeners = [];
+    // notification element -> its entry, text can be set after element is inserted
+    var entries = new WeakMap();
+    var isNotification = function (n) {
+        return n && n.nodeType === 1 && typeof n.className === 'string' && n.className.indexOf('notification') !== -1;
+    };
+    var record = function (n) {
+        var text = n.textContent, buffer = window.__pmNotifications;
+        if (!text || !text.trim()) return;
+        var entry = entries.get(n), now = Date.now();
+        if (entry && entry.text === text) return;
+        var since = window.__pmSubmitAt ? now - window.__pmSubmitAt : null;
+        if (entry && buffer.indexOf(entry) !== -1) {
+            // not taken yet, text is updated in place
+            entry.text = text;
+            entry.class_name = n.className;
+            entry.timestamp = now;
+            entry.since_submit = since;
+        } else {
+            entry = {text: text, class_name: n.className, timestamp: now, since_submit: since};
+            entries.set(n, entry);
+            buffer.push(entry);
+            // keep buffer bounded
+            if (buffer.length > 200) buffer.shift();
+        }
+        window.__pmNotificationListeners.slice().forEach(function (listener) { listener(); });
+    };
+    var recordTree = function (node) {
+        if (node.nodeType !== 1) return;
+        if (isNotification(node)) record(node);
+        Array.prototype.forEach.call(node.querySelectorAll('[class*="notification"]'), function (n) {
+            if (isNotification(n)) record(n);
+        });
+    };
+    var closestNotification = function (node) {
+        for (var n = node.nodeType === 1 ? node : node.parentNode; n && n !== document; n = n.parentNode) {
+            if (isNotification(n)) return n;
+        }
+        return null;
+    };
+    new MutationObserver(function (mutations) {
+        mutations.forEach(function (m) {
+            Array.prototype.forEach.call(m.addedNodes, recordTree);
+            // text or children of existing notification changed
+            var notification = closestNotification(m.target);
+            if (notification) record(notification);
+        });
+    }).observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+    // time of last Submit click, to measure time from Submit to notification
+    document.addEventListener('click', function (e) {
+        if (e.target.closest && e.target.closest('[type=submit]')) window.__pmSubmitAt = Date.now();
+    }, true);
+}
+"""
+
+NOTIFICATIONS_INSTALL = _NOTIFICATIONS_RECORDER
+
+# Read recorded notifications. arguments: clear buffer after read
+NOTIFICATIONS_GET = _NOTIFICATIONS_RECORDER + """
+var entries = window.__pmNotifications.slice();
+if (arguments[0]) window.__pmNotifications.length = 0;
+return entries;
+"""
+
+# Take recorded notification with text and class, wait for it if not recorded yet.
+# Notification currently present in DOM (matched by xpath) counts too.
+# arguments: text, class, xpath, timeout in ms, async callback
+# result: notification entry or null on timeout
+NOTIFICATIONS_TAKE = _NOTIFICATIONS_RECORDER + """
+var text = arguments[0], cls = arguments[1], xpath = arguments[2], timeoutMs = arguments[3];
+var done = arguments[arguments.length - 1];
+function take() {
+    var buffer = window.__pmNotifications;
+    for (var i = 0; i < buffer.length; i++) {
+        if (buffer[i].text === text && buffer[i].class_name.indexOf(cls) !== -1) {
+            // consume entry, so the same text of next action is not confused with this one
+            return buffer.splice(i, 1)[0];
+        }
+    }
+    var node = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    return node ? {text: node.textContent, class_name: node.className, timestamp: Date.now()} : null;
+}
+var found = take();
+if (found || timeoutMs <= 0) {
+    done(found);
+    return;
+}
+var listeners = window.__pmNotificationListeners, timer = null;
+var listener = function () {
+    var found = take();
+    if (found) {
+        listeners.splice(listeners.indexOf(listener), 1);
+        clearTimeout(timer);
+        done(found);
+    }
+};
+listeners.push(listener);
+timer = setTimeout(function () {
+    listeners.splice(listeners.indexOf(listener), 1);
+    done(null);
+}, timeoutMs);
+"""
+
+# Take recorded notifications for all texts, wait until all are recorded.
+# arguments: list of texts, class, timeout in ms, async callback
+# result: list of texts which were found
+NOTIFICATIONS_TAKE_ALL = _NOTIFICATIONS_RECORDER + """
+var pending = arguments[0].slice(), cls = arguments[1], timeoutMs = arguments[2];
+var done = arguments[arguments.length - 1];
+var found = [];
+function take() {
+    var buffer = window.__pmNotifications;
+    for (var i = buffer.length - 1; i >= 0; i--) {
+        var index = pending.indexOf(buffer[i].text);
+        if (index !== -1 && buffer[i].class_name.indexOf(cls) !== -1) {
+            found.push(pending.splice(index, 1)[0]);
+            buffer.splice(i, 1);
+        }
+    }
+    return pending.length === 0;
+}
+if (take() || timeoutMs <= 0) {
+    done(found);
+    return;
+}
+var listeners = window.__pmNotificationListeners, timer = null;
+var listener = function () {
+    if (take()) {
+        listeners.splice(listeners.indexOf(listener), 1);
+        clearTimeout(timer);
+        done(found);
+    }
+};
+listeners.push(listener);
+timer = setTimeout(function () {
+    listeners.splice(listeners.indexOf(listener), 1);
+    done(found);
+}, timeoutMs);
+"""
+
+# Collect long tasks from page start, installed with Page.addScriptToEvaluateOnNewDocument
+LONG_TASKS_OBSERVER = """
+window.__pmLongTasks = [];
+try {
+    new PerformanceObserver(function (list) {
+        list.getEntries().forEach(function (entry) { window.__pmLongTasks.push(entry.duration); });
+    }).observe({entryTypes: ['longtask']});
+} catch (e) {}
+"""
+
+# Navigation timing of current document and long tasks since previous call, ms
+PAGE_PERFORMANCE = """
+var nav = window.performance.getEntriesByType('navigation')[0];
+var tasks = window.__pmLongTasks || [];
+window.__pmLongTasks = [];
+var result = {long_tasks: tasks.length, long_tasks_time: tasks.reduce(function (a, b) { return a + b; }, 0)};
+if (arguments[0] && nav) {
+    result.ttfb = nav.responseStart;
+    result.dom_content_loaded = nav.domContentLoadedEventEnd;
+    result.load = nav.loadEventEnd;
+}
+return result;
+"""
+
+# Read colors of items by names in one call.
+# arguments: list of names, rows xpath, item name xpath, item color xpath
+# result: {name: {inline: style attribute, computed: computed color}} for found items
+ITEMS_COLORS = """
+var names = arguments[0], rowsXpath = arguments[1], nameXpath = arguments[2], colorXpath = arguments[3];
+var wanted = {};
+names.forEach(function (name) { wanted[name] = true; });
+var rows = document.evaluate(rowsXpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+var result = {};
+for (var i = 0; i < rows.snapshotLength; i++) {
+    var row = rows.snapshotItem(i);
+    var name = document.evaluate(nameXpath, row, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    if (!name || !wanted[name.textContent] || result[name.textContent]) continue;
+    var color = document.evaluate(colorXpath, row, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    result[name.textContent] = color ? {
+        inline: color.getAttribute('style'),
+        computed: window.getComputedStyle(color).color
+    } : {inline: null, computed: null};
+}
+return result;
+"""
@@ -0,0 +1,107 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from urllib.parse import urlsplit
+
+from . import scripts
+from .config import Config
+
+
+class SessionStore:
+    """
+    Stores cookies and local/session storage of logged in browser on disk,
+    so new drivers can be hydrated without going through login form
+    """
+
+    def __init__(self, username=None, ttl=None, directory=None, base_url=None):
+        self.username = Config.USERNAME if username is None else username
+        self.base_url = base_url or Config.BASE_URL
+        self.ttl = Config.SESSION_TTL if ttl is None else ttl
+        self.directory = directory or Config.SESSION_DIR
+
+    @property
+    def path(self):
+        # do not put username to file name
+        key = hashlib.sha256(f'{self.base_url} {self.username}'.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.directory, f'{key}.json')
+
+    @property
+    def user_hash(self):
+        # saved instead of username, file is checked to belong to user without keeping username in plain text
+        return hashlib.sha256(self.username.encode('utf-8')).hexdigest()
+
+    def save(self, driver):
+        """
+        Save session of logged in driver
+        :param driver: selenium.webdriver
+        :return: None
+        """
+        url = driver.current_url
+        data = {
+            'user': self.user_hash,
+            'saved_at': time.time(),
+            'origin': _origin(url),
+            'cookies': driver.get_cookies(),
+            'storage': driver.execute_script(scripts.STORAGE_DUMP),
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        # write to temp file and replace, parallel workers can save the same session.
+        # session file contains auth tokens, make it readable by owner only
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(fd, 'w', encoding='utf-8') as w_file:
+            json.dump(data, w_file)
+        os.replace(tmp_path, self.path)
+        logging.info(f'Session saved to "{self.path}"')
+
+    def load(self):
+        """
+        Read saved session
+        :return: dict or None if session is absent, broken or expired
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as r_file:
+                data = json.load(r_file)
+        except (FileNotFoundError, json.decoder.JSONDecodeError):
+            return None
+
+        if data.get('user') != self.user_hash:
+            return None
+        if time.time() - data.get('saved_at', 0) > self.ttl:
+            logging.info('Saved session is expired')
+            self.clear()
+            return None
+        return data
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def restore(self, driver):
+        """
+        Put saved cookies and storage to driver
+        :param driver: selenium.webdriver
+        :return: True if saved session was applied
+        """
+        data = self.load()
+        if not data:
+            return False
+
+        # cookies and storage can be set only for currently opened origin
+        driver.get(data['origin'])
+        for cookie in data['cookies']:
+            if 'expiry' in cookie:
+                cookie['expiry'] = int(cookie['expiry'])
+            driver.add_cookie(cookie)
+        driver.execute_script(scripts.STORAGE_RESTORE, data['storage'])
+        logging.info(f'Session restored from "{self.path}"')
+        return True
+
+
+def _origin(url):
+    parts = urlsplit(url)
+    return f'{parts.scheme}://{parts.netloc}/'
@@ -0,0 +1,224 @@
+"""
+Local stand-in for ProtonMail login and Settings Folders/labels pages.
+Pages have the same ids and data-test-id attributes as locators.py relies on,
+items are stored in server memory, latency of every request can be injected
+"""
+import os
+import json
+import time
+import random
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from ..colors import registry
+
+STATIC_DIR = os.path.join(os.path.dirname(__file__), 'static')
+AUTH_COOKIE = 'standin-auth=1'
+
+
+def _colors():
+    """
+    hex colors of color selector
+    :return: list of strings
+    """
+    return [color.hex for color in registry.values()]
+
+
+class ItemsStore:
+    """
+    Folders and labels of stand-in account
+    """
+
+    def __init__(self):
+        self._items = []
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def seed(self, count):
+        """
+        Replace all items with count generated folders and labels
+        :param count: number of items
+        :return: None
+        """
+        colors = _colors()
+        with self._lock:
+            self._items = []
+            for i in range(count):
+                item_type = 'folder' if i % 2 == 0 else 'label'
+                self._items.append({'id': self._next_id, 'name': f'seed_{item_type}{i}',
+                                    'type': item_type, 'color': random.choice(colors)})
+                self._next_id += 1
+
+    def all(self):
+        with self._lock:
+            return list(self._items)
+
+    def create(self, name, color, item_type):
+        with self._lock:
+            item = {'id': self._next_id, 'name': name, 'type': item_type, 'color': color}
+            self._next_id += 1
+            self._items.append(item)
+            return item
+
+    def update(self, item_id, name, color):
+        with self._lock:
+            for item in self._items:
+                if item['id'] == item_id:
+                    item.update(name=name, color=color)
+                    return dict(item)
+        return None
+
+    def delete(self, item_id):
+        with self._lock:
+            before = len(self._items)
+            self._items = [item for item in self._items if item['id'] != item_id]
+            return len(self._items) != before
+
+
+class _Handler(BaseHTTPRequestHandler):
+    PAGES = {'/': 'login.html', '/login': 'login.html',
+             '/inbox': 'inbox.html', '/settings/labels': 'labels.html'}
+    # pages available only after login
+    PROTECTED = ('/inbox', '/settings/labels')
+
+    def log_message(self, format, *args):
+        logging.debug(f'Stand-in: {format % args}')
+
+    def _delay(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+    def _send(self, code, body, content_type='application/json'):
+        data = body.encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, code, obj):
+        self._send(code, json.dumps(obj))
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def _item_id(self):
+        """
+        id of item from path /api/items/<id>
+        :return: int or None if path is not item path
+        """
+        prefix, _, item_id = urlsplit(self.path).path.rstrip('/').rpartition('/')
+        if prefix != '/api/items' or not item_id.isdigit():
+            return None
+        return int(item_id)
+
+    def do_GET(self):
+        self._delay()
+        path = urlsplit(self.path).path.rstrip('/') or '/'
+        if path == '/api/items':
+            return self._send_json(200, self.server.items.all())
+        if path not in self.PAGES:
+            return self._send(404, 'Not found', 'text/plain')
+        if path in self.PROTECTED and AUTH_COOKIE not in (self.headers.get('Cookie') or ''):
+            self.send_response(302)
+            self.send_header('Location', '/login')
+            self.end_headers()
+            return None
+        return self._send(200, self.server.render(self.PAGES[path]), 'text/html')
+
+    def do_POST(self):
+        self._delay()
+        if self.path != '/api/items':
+            return self._send(404, 'Not found', 'text/plain')
+        data = self._read_json()
+        item = self.server.items.create(data.get('name', ''), data.get('color'), data.get('type', 'folder'))
+        return self._send_json(201, item)
+
+    def do_PUT(self):
+        self._delay()
+        if self._item_id() is None:
+            return self._send(404, 'Not found', 'text/plain')
+        data = self._read_json()
+        item = self.server.items.update(self._item_id(), data.get('name', ''), data.get('color'))
+        return self._send_json(200, item) if item else self._send_json(404, {})
+
+    def do_DELETE(self):
+        self._delay()
+        if self._item_id() is None:
+            return self._send(404, 'Not found', 'text/plain')
+        deleted = self.server.items.delete(self._item_id())
+        return self._send_json(200 if deleted else 404, {})
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, items, latency, welcome_dialog):
+        super().__init__(address, _Handler)
+        self.items = items
+        self.latency = latency
+        self.welcome_dialog = welcome_dialog
+        self._templates = {}
+
+    def render(self, page):
+        if page not in self._templates:
+            with open(os.path.join(STATIC_DIR, page), 'r', encoding='utf-8') as r_file:
+                self._templates[page] = r_file.read()
+        return (self._templates[page]
+                .replace('{{COLORS}}', json.dumps(_colors()))
+                .replace('{{WELCOME_DIALOG}}', 'true' if self.welcome_dialog else 'false'))
+
+
+class StandInServer:
+    """
+    Stand-in server running in background thread.
+    Point page objects to it with pages.set_base_url(server.url)
+    """
+
+    def __init__(self, items=0, latency=0.0, welcome_dialog=True, host='127.0.0.1', port=0):
+        """
+        :param items: number of generated items (up to 10k)
+        :param latency: seconds added to every request
+        :param welcome_dialog: show Welcome dialog after login
+        :param host:
+        :param port: 0 - any free port
+        """
+        self.items = ItemsStore()
+        self.items.seed(items)
+        self._httpd = _HTTPServer((host, port), self.items, latency, welcome_dialog)
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def latency(self):
+        return self._httpd.latency
+
+    @latency.setter
+    def latency(self, value):
+        self._httpd.latency = value
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logging.info(f'Stand-in server started at {self.url}')
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+        logging.info('Stand-in server stopped')
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
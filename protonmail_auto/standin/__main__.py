@@ -0,0 +1,30 @@
+import time
+import logging
+import argparse
+
+from . import StandInServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for ProtonMail Folders/labels settings page')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--items', type=int, default=0, help='number of generated folders/labels')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every request')
+    parser.add_argument('--no-welcome-dialog', action='store_true')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = StandInServer(items=args.items, latency=args.latency, welcome_dialog=not args.no_welcome_dialog,
+                           host=args.host, port=args.port)
+    with server:
+        print(f'Serving at {server.url}. Press Ctrl+C to stop')
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
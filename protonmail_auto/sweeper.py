@@ -0,0 +1,119 @@
+"""
+Reset of account state: removal of items left by tests
+"""
+import re
+import time
+import logging
+import threading
+from concurrent.futures import Future
+
+from .bulk import BulkReport
+from .config import Config
+from .namespace import Namespace, run_id
+from .pages import SettingsFoldersPage
+from .pool import _quit, start_browser
+
+
+def namespace_pattern(namespace):
+    """
+    pattern of items of namespace
+    :param namespace: Namespace
+    :return: compiled regex
+    """
+    return re.compile(rf'^{re.escape(namespace.prefix)}-')
+
+
+def leftovers_pattern():
+    """
+    pattern of items of all other test runs, e.g. crashed ones.
+    Group 'started' is unix time of start of run worker, see Namespace
+    :return: compiled regex
+    """
+    return re.compile(rf'^{re.escape(Config.TEST_NAMESPACE)}-(?!{re.escape(run_id())}-)[^-]+-[^-]+-(?P<started>\d+)-')
+
+
+class Sweeper:
+    def __init__(self, pattern, min_age=0):
+        """
+        :param pattern: regex string or compiled regex of item names to remove
+        :param min_age: seconds. If set, only items with group 'started' of pattern (unix time)
+            older than min_age are removed, so items of runs which may still be going on are kept
+        """
+        self.pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+        self.min_age = min_age
+
+    def matches(self, name, now=None):
+        """
+        :param name: item name
+        :param now: unix time, current by default
+        :return: True if item should be removed
+        """
+        match = self.pattern.match(name) if name else None
+        if not match:
+            return False
+        if not self.min_age:
+            return True
+        started = match.groupdict().get('started')
+        return started is not None and (now or time.time()) - int(started) >= self.min_age
+
+    def sweep(self, driver):
+        """
+        Find matching items with one table snapshot and delete them with bulk delete
+        :param driver: selenium.webdriver opened on Settings Folder/Labels page
+        :return: BulkReport
+        """
+        settings_page = SettingsFoldersPage(driver)
+        settings_page.close_modal_dialog()
+        now = time.time()
+        names = [name for name in settings_page.get_items_snapshot().names() if self.matches(name, now)]
+        if not names:
+            report = BulkReport('sweep')
+            report.finish()
+            return report
+        logging.info(f'Sweep {len(names)} items matching "{self.pattern.pattern}"')
+        report = settings_page.delete_items(names)
+        logging.info(f'Sweep: {report}')
+        return report
+
+    def sweep_in_background(self, factory=start_browser):
+        """
+        Start own browser and sweep in background thread. Browsers of pool are not used,
+        so tests run meanwhile, also with one browser in pool
+        :param factory: callable returning logged in browser opened on Settings Folder/Labels page
+        :return: Future with BulkReport
+        """
+        future = Future()
+
+        def run():
+            try:
+                driver = factory()
+                try:
+                    future.set_result(self.sweep(driver))
+                finally:
+                    _quit(driver)
+            except Exception as exc:
+                logging.warning(f'Sweep failed: {exc}')
+                future.set_exception(exc)
+
+        threading.Thread(target=run, daemon=True, name='sweeper').start()
+        return future
+
+
+def sweep_namespace(driver, namespace=None):
+    """
+    Delete items of namespace of current run/worker
+    :param driver: selenium.webdriver
+    :param namespace: Namespace, current by default
+    :return: BulkReport
+    """
+    return Sweeper(namespace_pattern(namespace or Namespace())).sweep(driver)
+
+
+def sweep_leftovers(factory=start_browser):
+    """
+    Delete items of other test runs started more than Config.SWEEP_MIN_AGE seconds ago,
+    in background on own browser
+    :param factory: callable returning logged in browser
+    :return: Future with BulkReport
+    """
+    return Sweeper(leftovers_pattern(), Config.SWEEP_MIN_AGE).sweep_in_background(factory)
@@ -0,0 +1,129 @@
+"""
+Adaptive wait timeouts: latency of every wait site (page method + condition) is recorded
+and persisted between runs, timeout is a high percentile of it plus margin.
+Each pytest-xdist worker saves own history file, files of all workers are merged on read
+"""
+import os
+import glob
+import json
+import math
+import threading
+from collections import defaultdict
+
+from .config import Config
+from .namespace import worker_id
+
+# samples kept per wait site
+HISTORY_SIZE = 200
+# samples needed before learned timeout is used
+MIN_SAMPLES = 10
+
+
+def percentile(samples, percent):
+    """
+    nearest-rank percentile
+    :param samples: list of numbers
+    :param percent: 0..100
+    :return: number
+    """
+    ordered = sorted(samples)
+    index = max(0, math.ceil(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def _read(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as r_file:
+            return json.load(r_file)
+    except (FileNotFoundError, json.decoder.JSONDecodeError):
+        return {}
+
+
+class TimeoutPolicy:
+    def __init__(self, path=None):
+        self.path = path
+        self._history = None
+        # samples of current run, merged to file on save
+        self._new = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def history_path(self, worker='master'):
+        """
+        :param worker: pytest-xdist worker name
+        :return: history file of worker, e.g. data/wait_latency_gw0.json
+        """
+        path = self.path or Config.WAIT_HISTORY
+        if worker == 'master':
+            return path
+        root, ext = os.path.splitext(path)
+        return f'{root}_{worker}{ext}'
+
+    def _load(self):
+        """
+        :return: dict {site: samples} merged from history files of all workers
+        """
+        history = defaultdict(list)
+        root, ext = os.path.splitext(self.history_path())
+        for path in [self.history_path()] + sorted(glob.glob(f'{glob.escape(root)}_*{ext}')):
+            for site, samples in _read(path).items():
+                history[site].extend(samples)
+        return dict(history)
+
+    def _samples(self, site):
+        if self._history is None:
+            self._history = self._load()
+        return self._history.setdefault(site, [])
+
+    def timeout(self, site, default):
+        """
+        :param site: wait site id
+        :param default: timeout used until enough latency is recorded
+        :return: seconds
+        """
+        if not Config.ADAPTIVE_TIMEOUTS:
+            return default
+        with self._lock:
+            samples = self._samples(site)
+            if len(samples) < MIN_SAMPLES:
+                return default
+            learned = percentile(samples, Config.TIMEOUT_PERCENTILE) + Config.TIMEOUT_MARGIN
+        return min(max(learned, Config.TIMEOUT_MIN), Config.TIMEOUT_MAX)
+
+    def observe(self, site, seconds):
+        """
+        Record latency of satisfied wait.
+        Timed out waits are not recorded: their latency is unknown, and recording the timeout
+        would raise learned timeout by margin on every timeout up to TIMEOUT_MAX
+        :param site: wait site id
+        :param seconds: time of wait
+        :return: None
+        """
+        with self._lock:
+            samples = self._samples(site)
+            samples.append(seconds)
+            self._new[site].append(seconds)
+
+    def save(self):
+        """
+        Add latency of current run to history file of this worker.
+        The file is written by this process only, files of other workers are not touched
+        :return: None
+        """
+        path = self.history_path(worker_id())
+        with self._lock:
+            if not self._new:
+                return
+            history = _read(path)
+            for site, values in self._new.items():
+                samples = history.setdefault(site, [])
+                samples.extend(values)
+                del samples[:-HISTORY_SIZE]
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            tmp_path = f'{path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as w_file:
+                json.dump(history, w_file)
+            os.replace(tmp_path, path)
+            self._new.clear()
+
+
+policy = TimeoutPolicy()
@@ -0,0 +1,367 @@
+"""
+Trace of WebDriver commands sent by page objects (arguments, response, timing)
+streamed to gzipped JSON lines, and replay of trace against local stand-in.
+Usage:
+python -m protonmail_auto.trace replay data/traces/master_1.jsonl.gz --timing original
+python -m protonmail_auto.trace diff old.jsonl.gz new.jsonl.gz
+"""
+import os
+import sys
+import json
+import gzip
+import time
+import zlib
+import logging
+import argparse
+import threading
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.webelement import WebElement
+
+from . import scripts
+from .browser import create_driver
+from .config import Config
+from .context import current_test
+from .instrumentation import _page_method
+from .logs import REDACTED, credentials
+from .namespace import worker_id
+from .standin import StandInServer
+
+ELEMENT_KEY = 'element-6066-11e4-a52f-4a5dbfaac10a'
+# commands of session lifecycle are done by replaying driver itself
+NOT_REPLAYED = {Command.NEW_SESSION, Command.QUIT}
+# gzip stream is flushed after this number of records, so trace of crashed run is readable
+FLUSH_EVERY = 50
+# differences smaller than this are noise, seconds
+NOISE_FLOOR = 0.005
+# commands with session cookies in params or response, values of cookies are redacted
+COOKIE_COMMANDS = {Command.ADD_COOKIE, Command.GET_ALL_COOKIES, Command.GET_COOKIE}
+# scripts with session storage in arguments or result (see session.SessionStore), both are redacted
+SECRET_SCRIPTS = {scripts.STORAGE_DUMP, scripts.STORAGE_RESTORE}
+
+
+def _encode(value, limit=None):
+    """
+    JSON compatible value, WebElement -> element reference, long strings are cut to limit
+    """
+    if isinstance(value, WebElement):
+        return {ELEMENT_KEY: value.id}
+    if isinstance(value, dict):
+        return {str(key): _encode(item, limit) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item, limit) for item in value]
+    if isinstance(value, str) and limit and len(value) > limit:
+        return f'{value[:limit]}...<{len(value)} chars>'
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _redact_credentials(value, secrets):
+    if isinstance(value, dict):
+        return {key: _redact_credentials(item, secrets) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_redact_credentials(item, secrets) for item in value]
+    if isinstance(value, str):
+        for secret in secrets:
+            value = value.replace(secret, REDACTED)
+    return value
+
+
+def _redact_cookies(value):
+    if isinstance(value, dict) and 'value' in value:
+        return {**value, 'value': REDACTED}
+    if isinstance(value, list):
+        return [_redact_cookies(item) for item in value]
+    return value
+
+
+def _redact(command, params, value):
+    """
+    Remove secrets from encoded command: account credentials anywhere, values of cookies,
+    arguments and results of session storage scripts
+    :return: tuple (params, value)
+    """
+    secrets = credentials()
+    if command == Command.SEND_KEYS_TO_ELEMENT and 'text' in params:
+        text = _redact_credentials(params['text'], secrets)
+        if text != params['text']:
+            # value is list of single characters, not matched by secrets
+            params = {**params, 'text': text, 'value': list(text)}
+    params, value = _redact_credentials(params, secrets), _redact_credentials(value, secrets)
+    if command == Command.ADD_COOKIE and 'cookie' in params:
+        params = {**params, 'cookie': _redact_cookies(params['cookie'])}
+    elif command in COOKIE_COMMANDS:
+        value = _redact_cookies(value)
+    elif params.get('script') in SECRET_SCRIPTS:
+        params = {**params, 'args': REDACTED}
+        value = REDACTED if value is not None else None
+    return params, value
+
+
+class TraceWriter:
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.started = time.perf_counter()
+        self._file = gzip.open(path, 'wb')
+        self._lock = threading.Lock()
+        self._count = 0
+        self._test = None
+        self.write({'trace': 1, 'base_url': Config.BASE_URL, 'time': time.time()})
+
+    def write(self, record):
+        line = json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n'
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(line)
+            self._count += 1
+            if self._count % FLUSH_EVERY == 0:
+                self._file.flush(zlib.Z_SYNC_FLUSH)
+
+    def command(self, test, command, params, start, elapsed, method, value=None, error=None):
+        if test != self._test:
+            self._test = test
+            self.write({'test': test})
+        # long values are cut after redaction, so part of secret cannot be left
+        params, value = _redact(command, _encode(params or {}), _encode(value))
+        record = {'t': round(start - self.started, 4), 'd': round(elapsed, 4), 'c': command,
+                  'p': params, 'm': method}
+        if error:
+            record['e'] = error
+        else:
+            record['r'] = _encode(value, Config.TRACE_MAX_VALUE)
+        self.write(record)
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class TraceRecorder:
+    def __init__(self):
+        self.enabled = False
+        self._writers = []
+        self._lock = threading.Lock()
+
+    def attach(self, driver):
+        """
+        Wrap driver.execute to write every command to new trace file.
+        Does nothing if recorder is disabled or driver is already traced
+        :param driver: selenium.webdriver
+        :return: driver
+        """
+        if not self.enabled or getattr(driver, '_traced', False):
+            return driver
+        with self._lock:
+            writer = TraceWriter(trace_path(worker_id(), len(self._writers) + 1))
+            self._writers.append(writer)
+        execute = driver.execute
+
+        def traced_execute(driver_command, params=None):
+            method = _page_method()
+            # selenium adds sessionId to params
+            recorded = {key: value for key, value in (params or {}).items() if key != 'sessionId'}
+            start = time.perf_counter()
+            try:
+                response = execute(driver_command, params)
+            except WebDriverException as exc:
+                writer.command(current_test(), driver_command, recorded, start, time.perf_counter() - start,
+                               method, error=type(exc).__name__)
+                raise
+            writer.command(current_test(), driver_command, recorded, start, time.perf_counter() - start,
+                           method, value=response.get('value'))
+            if driver_command == Command.QUIT:
+                writer.close()
+            return response
+
+        driver.execute = traced_execute
+        driver._traced = True
+        logging.info('Trace of WebDriver commands: %s', writer.path)
+        return driver
+
+    def close(self):
+        with self._lock:
+            for writer in self._writers:
+                writer.close()
+
+    def paths(self):
+        return [writer.path for writer in self._writers]
+
+
+tracer = TraceRecorder()
+
+
+def trace_path(worker='master', index=1):
+    return os.path.join(Config.DATA_DIR, 'traces', f'{worker}_{index}.jsonl.gz')
+
+
+def read_trace(path):
+    """
+    Records of trace, last incomplete line of crashed run is ignored
+    :param path: trace file
+    :return: header dict, list of command dicts (with test of command)
+    """
+    header, commands, test = {}, [], None
+    with gzip.open(path, 'rt', encoding='utf-8') as r_file:
+        try:
+            for line in r_file:
+                try:
+                    record = json.loads(line)
+                except json.decoder.JSONDecodeError:
+                    break
+                if 'trace' in record:
+                    header = record
+                elif 'test' in record:
+                    test = record['test']
+                else:
+                    record['test'] = test
+                    commands.append(record)
+        except EOFError:
+            pass
+    return header, commands
+
+
+class Replayer:
+    def __init__(self, driver, base_url=None, timing='fast'):
+        """
+        :param driver: selenium.webdriver, opened on any page
+        :param base_url: recorded base url is replaced with it in navigation commands
+        :param timing: 'fast' - send commands one by one, 'original' - keep recorded start times
+        """
+        self.driver = driver
+        self.base_url = base_url
+        self.timing = timing
+        # recorded element id -> element id in replaying browser
+        self._elements = {}
+
+    def _map_elements(self, recorded, actual):
+        if isinstance(actual, WebElement) and isinstance(recorded, dict) and ELEMENT_KEY in recorded:
+            self._elements[recorded[ELEMENT_KEY]] = actual.id
+        elif isinstance(actual, list) and isinstance(recorded, list):
+            for recorded_item, actual_item in zip(recorded, actual):
+                self._map_elements(recorded_item, actual_item)
+        elif isinstance(actual, dict) and isinstance(recorded, dict):
+            for key, actual_item in actual.items():
+                self._map_elements(recorded.get(key), actual_item)
+
+    def _substitute(self, value):
+        if isinstance(value, dict):
+            return {key: self._substitute(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._substitute(item) for item in value]
+        if isinstance(value, str):
+            return self._elements.get(value, value)
+        return value
+
+    def replay(self, path):
+        """
+        Send commands of trace to driver
+        :param path: trace file
+        :return: list of dicts: command, method, test, recorded and replayed seconds, error
+        """
+        header, commands = read_trace(path)
+        recorded_base = header.get('base_url')
+        steps = []
+        started = time.perf_counter()
+        for record in commands:
+            if record['c'] in NOT_REPLAYED:
+                continue
+            params = self._substitute(record['p'])
+            if record['c'] == Command.GET and self.base_url and recorded_base:
+                params['url'] = params['url'].replace(recorded_base, self.base_url, 1)
+            if self.timing == 'original':
+                delay = record['t'] - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            step = {'command': record['c'], 'method': record.get('m'), 'test': record.get('test'),
+                    'recorded': record['d'], 'replayed': None, 'error': None}
+            start = time.perf_counter()
+            try:
+                response = self.driver.execute(record['c'], params)
+                self._map_elements(record.get('r'), response.get('value'))
+                if 'e' in record:
+                    step['error'] = f'recorded {record["e"]}, replayed without error'
+            except WebDriverException as exc:
+                if record.get('e') != type(exc).__name__:
+                    step['error'] = type(exc).__name__
+            step['replayed'] = time.perf_counter() - start
+            steps.append(step)
+        return steps
+
+
+def slowdowns(steps, threshold=0.2, top=10):
+    """
+    Steps replayed slower than recorded
+    :param steps: result of Replayer.replay or diff
+    :param threshold: allowed slowdown, 0.2 means 20%
+    :return: list of strings, slowest first
+    """
+    slow = [step for step in steps if step['replayed'] is not None
+            and step['replayed'] - step['recorded'] > NOISE_FLOOR
+            and step['replayed'] > step['recorded'] * (1 + threshold)]
+    slow.sort(key=lambda step: step['replayed'] - step['recorded'], reverse=True)
+    return [f'{step["command"]} in {step["method"]} ({step["test"]}): '
+            f'{step["replayed"]:.4f}s, recorded {step["recorded"]:.4f}s' for step in slow[:top]]
+
+
+def diff(old_path, new_path):
+    """
+    Compare two traces command by command
+    :return: list of step dicts as Replayer.replay, error - if commands differ
+    """
+    _, old = read_trace(old_path)
+    _, new = read_trace(new_path)
+    steps = []
+    for old_record, new_record in zip(old, new):
+        steps.append({'command': new_record['c'], 'method': new_record.get('m'), 'test': new_record.get('test'),
+                      'recorded': old_record['d'], 'replayed': new_record['d'],
+                      'error': None if old_record['c'] == new_record['c'] else f'was {old_record["c"]}'})
+    if len(old) != len(new):
+        logging.warning('Traces have different number of commands: %d and %d', len(old), len(new))
+    return steps
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Replay and compare traces of WebDriver commands')
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown')
+    subparsers = parser.add_subparsers(dest='action', required=True)
+    replay_parser = subparsers.add_parser('replay', parents=[common], help='replay trace against stand-in server')
+    replay_parser.add_argument('trace')
+    replay_parser.add_argument('--timing', choices=['fast', 'original'], default='fast')
+    replay_parser.add_argument('--items', type=int, default=0, help='number of items generated in stand-in')
+    replay_parser.add_argument('--latency', type=float, default=0.0, help='stand-in latency, seconds')
+    diff_parser = subparsers.add_parser('diff', parents=[common], help='compare two traces command by command')
+    diff_parser.add_argument('old')
+    diff_parser.add_argument('new')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if args.action == 'replay':
+        with StandInServer(items=args.items, latency=args.latency) as server:
+            driver = create_driver()
+            try:
+                steps = Replayer(driver, server.url, args.timing).replay(args.trace)
+            finally:
+                driver.quit()
+    else:
+        steps = diff(args.old, args.new)
+
+    errors = [step for step in steps if step['error']]
+    logging.info('%d commands, %.2fs recorded, %.2fs replayed, %d mismatches', len(steps),
+                 sum(step['recorded'] for step in steps), sum(step['replayed'] or 0 for step in steps), len(errors))
+    for step in errors[:10]:
+        logging.warning('Mismatch: %s in %s: %s', step['command'], step['method'], step['error'])
+    for line in slowdowns(steps, args.threshold):
+        logging.warning('Slower: %s', line)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+Event driven waits: condition checks run in the page on DOM mutations,
+so wait is resolved right after the change instead of next WebDriverWait poll
+"""
+import sys
+import time
+import logging
+from collections import namedtuple
+
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import InvalidSelectorException
+from selenium.common.exceptions import JavascriptException
+from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException
+
+from . import scripts
+from .timeouts import policy
+
+# kind: title_is, title_contains, presence, absence, clickable. value: title text or xpath
+Condition = namedtuple('Condition', ['kind', 'value'])
+
+# extra seconds for script timeout, so page timer fires before webdriver one
+_SCRIPT_TIMEOUT_MARGIN = 2
+# used until timeout of wait site is learned, see timeouts.TimeoutPolicy
+DEFAULT_TIMEOUT = 5
+# script errors of chromedriver when document is replaced during wait, e.g. page reload
+_UNLOAD_ERRORS = ('document unloaded', 'execution context was destroyed')
+
+
+def title_is(title):
+    return Condition('title_is', title)
+
+
+def title_contains(text):
+    return Condition('title_contains', text)
+
+
+def presence_of(locator):
+    return Condition('presence', _to_xpath(locator))
+
+
+def absence_of(locator):
+    return Condition('absence', _to_xpath(locator))
+
+
+def clickable(locator):
+    return Condition('clickable', _to_xpath(locator))
+
+
+def _to_xpath(locator):
+    by, value = locator
+    if by == By.XPATH:
+        return value
+    if by == By.ID:
+        return f"//*[@id='{value}']"
+    raise Exception(f'waits: Unsupported locator type "{by}"')
+
+
+def wait_for_any(driver, conditions, timeout=None, site=None):
+    """
+    Wait for first satisfied condition
+    :param driver: selenium.webdriver
+    :param conditions: dict {name: Condition}. Checked in dict order
+    :param timeout: seconds. By default - learned from latency history of wait site
+    :param site: wait site id for latency history. By default - caller name and conditions
+    :return: tuple (name, WebElement or None) of satisfied condition
+    :raise TimeoutException: if no condition is satisfied
+    """
+    site = site or wait_site(conditions.values(), depth=2)
+    adaptive = timeout is None
+    if adaptive:
+        timeout = policy.timeout(site, DEFAULT_TIMEOUT)
+    args = [{'name': name, 'kind': c.kind, 'value': c.value} for name, c in conditions.items()]
+    started = time.monotonic()
+    deadline = started + timeout
+    set_script_timeout(driver, timeout)
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            found = driver.execute_async_script(scripts.WAIT_FOR_ANY, args, int(remaining * 1000))
+        except TimeoutException:
+            break
+        except InvalidSelectorException:
+            # subclass of NoSuchElementException in selenium 3, not transient
+            raise
+        except (StaleElementReferenceException, NoSuchElementException) as exc:
+            logging.info('Wait interrupted: %s', exc.msg)
+            time.sleep(0.05)
+            continue
+        except JavascriptException as exc:
+            if not _is_unload(exc):
+                raise
+            # page was reloaded during wait, install observer to new document
+            logging.info('Wait interrupted by page load: %s', exc.msg)
+            time.sleep(0.05)
+            continue
+        if found:
+            policy.observe(site, time.monotonic() - started)
+            return found['name'], found['element']
+        break
+
+    raise TimeoutException(f'None of conditions satisfied in {timeout:.1f}s: {list(conditions)}')
+
+
+def _is_unload(exc):
+    message = (exc.msg or '').lower()
+    return any(marker in message for marker in _UNLOAD_ERRORS)
+
+
+def until(driver, condition, timeout=None):
+    """
+    Wait for one condition, same as WebDriverWait(driver, timeout).until(..)
+    :param driver: selenium.webdriver
+    :param condition: Condition
+    :param timeout: seconds. By default - learned from latency history of wait site
+    :return: WebElement for element conditions, True for title conditions
+    :raise TimeoutException:
+    """
+    _, element = wait_for_any(driver, {condition.kind: condition}, timeout, site=wait_site([condition], depth=2))
+    return element if element is not None else True
+
+
+def wait_site(conditions, depth=1):
+    """
+    id of wait site: name of calling function and conditions
+    :param conditions: list of Condition
+    :param depth: 1 - caller of wait_site, 2 - its caller..
+    :return: string
+    """
+    caller = sys._getframe(depth).f_code.co_name
+    return f'{caller}: ' + ' | '.join(f'{c.kind} {c.value}' for c in conditions)
+
+
+def set_script_timeout(driver, timeout):
+    """
+    Make sure async script with page timer of timeout seconds is not killed by webdriver.
+    Extra round trip is done only if driver has smaller script timeout
+    :param driver: selenium.webdriver
+    :param timeout: seconds
+    :return: None
+    """
+    needed = timeout + _SCRIPT_TIMEOUT_MARGIN
+    if getattr(driver, '_wait_script_timeout', 0) < needed:
+        driver.set_script_timeout(needed)
+        driver._wait_script_timeout = needed
@@ -0,0 +1,123 @@
+import time
+import asyncio
+import threading
+
+from protonmail_auto import aio
+from protonmail_auto.aio import AsyncDriver, AsyncPage, _awaitable, compare
+
+
+class FakeDriver:
+    """
+    Blocking driver, remembers threads of commands and whether commands of this driver overlapped
+    """
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.threads = []
+        self.running = 0
+        self.overlapped = False
+        self.session_id = 'session'
+        self._lock = threading.Lock()
+
+    def _command(self, result):
+        with self._lock:
+            self.running += 1
+            self.overlapped |= self.running > 1
+        self.threads.append(threading.current_thread().name)
+        time.sleep(self.delay)
+        with self._lock:
+            self.running -= 1
+        return result
+
+    @property
+    def title(self):
+        return self._command('Title')
+
+    def get(self, url):
+        return self._command(url)
+
+
+class FakePage:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def open(self, url):
+        return self.driver.get(url)
+
+
+class AsyncFakePage(AsyncPage):
+    PAGE = FakePage
+
+    open = _awaitable('open')
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+class TestsAsyncDriver:
+    def test_property_is_read_in_pool(self):
+        driver = FakeDriver()
+
+        async def scenario():
+            return await AsyncDriver(driver).title
+
+        assert run(scenario()) == 'Title'
+        # not in event loop thread
+        assert len(driver.threads) == 1 and driver.threads[0].startswith('aio')
+
+    def test_plain_attribute(self):
+        assert AsyncDriver(FakeDriver()).session_id == 'session'
+
+    def test_commands_of_driver_are_serialized(self):
+        driver = FakeDriver()
+
+        async def scenario():
+            async_driver = AsyncDriver(driver)
+            return await asyncio.gather(async_driver.title, async_driver.get('a'), async_driver.title,
+                                        async_driver.get('b'))
+
+        assert run(scenario()) == ['Title', 'a', 'Title', 'b']
+        assert not driver.overlapped
+        assert 'MainThread' not in driver.threads
+
+    def test_drivers_run_concurrently(self):
+        drivers = [FakeDriver(delay=0.2) for _ in range(4)]
+
+        async def scenario():
+            started = time.perf_counter()
+            await asyncio.gather(*(AsyncDriver(driver).get('url') for driver in drivers))
+            return time.perf_counter() - started
+
+        assert run(scenario()) < 0.6
+
+    def test_page_methods(self):
+        driver = FakeDriver()
+
+        async def scenario():
+            return await AsyncFakePage(driver).open('url')
+
+        assert run(scenario()) == 'url'
+        assert driver.threads[0].startswith('aio')
+
+
+class TestsCompare:
+    def test_both_variants_run_scenario(self):
+        drivers = [FakeDriver() for _ in range(3)]
+        done = []
+
+        def scenario(session, driver):
+            done.append(('threads', session, driver.get('url')))
+
+        async def async_scenario(session, driver):
+            done.append(('adapters', session, await driver.get('url')))
+
+        async def benchmark():
+            return await compare([AsyncDriver(driver) for driver in drivers], scenario, async_scenario, repeat=2)
+
+        threads, adapters = run(benchmark())
+        assert threads > 0 and adapters > 0
+        assert sorted(done) == sorted([(variant, session, 'url') for variant in ('threads', 'adapters')
+                                       for session in range(3)] * 2)
+        assert not any(driver.overlapped for driver in drivers)
+        assert aio.get_executor()._max_workers == aio.Config.ASYNC_WORKERS
@@ -0,0 +1,62 @@
+import json
+import base64
+import logging
+import zipfile
+
+import pytest
+
+from protonmail_auto import artifacts
+from protonmail_auto.config import Config
+
+PNG = base64.b64encode(b'png').decode('ascii')
+
+
+class FakeDriver:
+    page_source = '<html></html>'
+
+    def __init__(self):
+        self.log_reads = 0
+
+    def get_screenshot_as_base64(self):
+        return PNG
+
+    def get_log(self, kind):
+        self.log_reads += 1
+        return [{'level': 'SEVERE', 'message': 'error'}]
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'DATA_DIR', str(tmp_path))
+    monkeypatch.delenv('PYTEST_XDIST_WORKER', raising=False)
+
+
+class TestsArtifacts:
+    def test_console_log_is_read_once(self):
+        driver = FakeDriver()
+        artifacts.start('test_a')
+        artifacts.capture(driver, 'first.png')
+        artifacts.capture(driver, 'second.png')
+        path = artifacts.finish().result()
+        assert driver.log_reads == 1
+        with zipfile.ZipFile(path) as archive:
+            # same screenshot and DOM are saved once
+            assert sorted(archive.namelist()) == ['console.json', 'first.html', 'first.png']
+            assert json.loads(archive.read('console.json')) == [{'level': 'SEVERE', 'message': 'error'}]
+
+    def test_nothing_captured(self):
+        artifacts.start('test_b')
+        assert artifacts.finish() is None
+
+    def test_wait_all_logs_failures(self, monkeypatch, caplog):
+        def write(self):
+            raise OSError('No space left on device')
+
+        monkeypatch.setattr(artifacts.ArtifactBundle, '_write', write)
+        artifacts.start('test_c')
+        artifacts.capture(FakeDriver(), 'failed.png')
+        artifacts.finish()
+        with caplog.at_level(logging.WARNING):
+            artifacts.wait_all()
+        assert 'No space left on device' in caplog.text
+        assert artifacts._pending == []
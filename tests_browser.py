@@ -0,0 +1,13 @@
+from protonmail_auto import browser
+
+
+class TestsServiceReport:
+    def test_time_saved(self, monkeypatch):
+        monkeypatch.setattr(browser.service_stats, 'sessions', 4)
+        monkeypatch.setattr(browser.service_stats, 'start_time', 0.25)
+        assert 'estimated time saved: 0.750s' in browser.service_report()
+
+    def test_one_session_saves_nothing(self, monkeypatch):
+        monkeypatch.setattr(browser.service_stats, 'sessions', 1)
+        monkeypatch.setattr(browser.service_stats, 'start_time', 0.25)
+        assert 'estimated time saved: 0.000s' in browser.service_report()
@@ -0,0 +1,25 @@
+import os
+import sys
+import subprocess
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def collect(*args):
+    """
+    Collect tests in separate pytest process, as pytest-xdist worker does
+    :return: list of node ids
+    """
+    result = subprocess.run([sys.executable, '-m', 'pytest', '--collect-only', '-q', *args],
+                            cwd=ROOT, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stdout + result.stderr
+    return [line for line in result.stdout.splitlines() if '::' in line]
+
+
+class TestsCollection:
+    def test_processes_collect_same_ids(self):
+        # random colors of parametrized tests must not get into ids, otherwise pytest-xdist
+        # stops with "Different tests were collected"
+        first = collect('tests_settings_folders_labels.py')
+        assert first
+        assert collect('tests_settings_folders_labels.py') == first
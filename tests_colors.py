@@ -0,0 +1,45 @@
+import pytest
+
+from protonmail_auto.colors import ColorCheck, ColorDiff, normalize, registry
+from protonmail_auto.locators import ColorsLocators, ColorsMap
+
+
+class TestsNormalize:
+    @pytest.mark.parametrize('value', [
+        'rgb(114, 114, 167)',
+        'rgba(114,114,167, 0.5)',
+        'color: rgb(114, 114, 167);',
+        '#7272a7',
+        '#7272A7',
+        'RGB_114_114_167',
+        ColorsLocators.RGB_114_114_167,
+        ColorsMap.RGB_114_114_167,
+        (114, 114, 167),
+    ])
+    def test_formats(self, value):
+        assert normalize(value) == (114, 114, 167)
+
+    def test_short_hex(self):
+        assert normalize('#fa0') == (255, 170, 0)
+
+    @pytest.mark.parametrize('value', [None, '', 'red', '#12345', 'color: ;'])
+    def test_not_a_color(self, value):
+        assert normalize(value) is None
+
+    def test_registry_is_consistent(self):
+        assert registry
+        for color in registry.values():
+            assert normalize(color.hex) == normalize(color.style) == color.rgb
+
+
+class TestsColorDiff:
+    def test_mismatches_and_missing(self):
+        diff = ColorDiff([
+            ColorCheck('a', (1, 2, 3), (1, 2, 3), True),
+            ColorCheck('b', (1, 2, 3), (3, 2, 1), False),
+            ColorCheck('c', (1, 2, 3), None, False),
+        ])
+        assert not diff.ok
+        assert [check.name for check in diff.mismatches()] == ['b']
+        assert diff.missing() == ['c']
+        assert str(diff) == '3 items checked, 1 wrong colors, 1 not found'
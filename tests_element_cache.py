@@ -0,0 +1,76 @@
+import pytest
+from selenium.common.exceptions import StaleElementReferenceException
+
+from protonmail_auto.element_cache import ElementCache
+
+
+class Resolver:
+    """
+    Locates new value on each call, counts calls
+    """
+
+    def __init__(self, value='element'):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return None if self.value is None else f'{self.value}{self.calls}'
+
+
+class TestsElementCache:
+    def test_value_is_resolved_once(self):
+        cache, resolve = ElementCache(), Resolver()
+        assert cache.get(('row', 'a'), resolve) == 'element1'
+        assert cache.get(('row', 'a'), resolve) == 'element1'
+        assert resolve.calls == 1
+
+    def test_none_is_not_cached(self):
+        cache, resolve = ElementCache(), Resolver(None)
+        assert cache.get(('row', 'a'), resolve) is None
+        assert cache.get(('row', 'a'), resolve) is None
+        assert resolve.calls == 2
+
+    def test_put(self):
+        cache, resolve = ElementCache(), Resolver()
+        cache.put(('row', 'a'), 'snapshot row')
+        assert cache.get(('row', 'a'), resolve) == 'snapshot row'
+        assert resolve.calls == 0
+
+    def test_use_relocates_stale_element_once(self):
+        cache, resolve = ElementCache(), Resolver()
+        used = []
+
+        def action(element):
+            used.append(element)
+            if element == 'element1':
+                raise StaleElementReferenceException('stale')
+            return 'clicked'
+
+        assert cache.use(('button', 'a'), resolve, action) == 'clicked'
+        assert used == ['element1', 'element2']
+        assert cache.get(('button', 'a'), resolve) == 'element2'
+
+    def test_use_raises_if_still_stale(self):
+        cache, resolve = ElementCache(), Resolver()
+
+        def action(element):
+            raise StaleElementReferenceException('stale')
+
+        with pytest.raises(StaleElementReferenceException):
+            cache.use(('button', 'a'), resolve, action)
+        assert resolve.calls == 2
+
+    def test_use_without_element(self):
+        cache = ElementCache()
+        assert cache.use(('button', 'a'), Resolver(None), lambda element: 'clicked') is None
+
+    def test_invalidate_item(self):
+        cache, resolve = ElementCache(), Resolver()
+        for key in (('row', 'a'), ('button', 'a'), ('row', 'b')):
+            cache.get(key, resolve)
+        cache.invalidate('a')
+        assert cache.get(('row', 'b'), resolve) == 'element3'
+        assert cache.get(('row', 'a'), resolve) == 'element4'
+        cache.invalidate()
+        assert cache.get(('row', 'b'), resolve) == 'element5'
@@ -0,0 +1,31 @@
+from protonmail_auto.items_table import ItemRow, ItemsTable
+
+
+def row(index, name, item_type='label', color='color: rgb(114, 114, 167);'):
+    return ItemRow(element=f'element{index}', index=index, name=name, item_type=item_type, color=color)
+
+
+class TestsItemsTable:
+    def test_lookup_by_name(self):
+        table = ItemsTable([row(0, 'a'), row(1, 'b', 'folder')])
+        assert len(table) == 2
+        assert 'b' in table and 'c' not in table
+        assert table.get('b').item_type == 'folder'
+        assert table.get('c') is None
+        assert table.names() == ['a', 'b']
+
+    def test_first_match_is_kept(self):
+        table = ItemsTable([row(0, 'a'), row(1, 'a'), row(2, 'b')])
+        assert table.get('a').index == 0
+        assert [r.index for r in table] == [0, 1, 2]
+
+    def test_empty(self):
+        table = ItemsTable([])
+        assert len(table) == 0
+        assert list(table) == [] and table.names() == []
+        assert table.get('a') is None
+
+    def test_rows_from_generator(self):
+        table = ItemsTable(row(i, f'item{i}') for i in range(3))
+        assert table.names() == ['item0', 'item1', 'item2']
+        assert table.get('item2').element == 'element2'
@@ -0,0 +1,53 @@
+import sys
+import json
+import logging
+
+import pytest
+
+from protonmail_auto import logs
+
+USERNAME = 'qa.user@example.com'
+PASSWORD = 'pa"ss\\wörd'
+
+
+@pytest.fixture
+def formatter(monkeypatch):
+    monkeypatch.setattr(logs, 'credentials', lambda: [USERNAME, PASSWORD])
+    return logs.RedactingFormatter(logs.JsonFormatter())
+
+
+def make_record(msg, args=(), exc_info=None, **extra):
+    record = logging.LogRecord('root', logging.INFO, __file__, 1, msg, args, exc_info)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestsRedaction:
+    def assert_redacted(self, output):
+        assert USERNAME not in output and PASSWORD not in output
+        assert json.dumps(PASSWORD)[1:-1] not in output
+        assert logs.REDACTED in output
+
+    def test_message_and_args(self, formatter):
+        output = formatter.format(make_record('Login %s with %s', (USERNAME, PASSWORD)))
+        self.assert_redacted(output)
+        assert json.loads(output)['message'] == 'Login *** with ***'
+
+    def test_extra_fields(self, formatter):
+        self.assert_redacted(formatter.format(make_record('Type', locator=('id', 'password'), value=PASSWORD)))
+
+    def test_exception(self, formatter):
+        try:
+            raise ValueError(f'Wrong password {PASSWORD}')
+        except ValueError:
+            record = make_record('Login failed', exc_info=sys.exc_info())
+        self.assert_redacted(formatter.format(record))
+
+    def test_plain_text(self, monkeypatch):
+        monkeypatch.setattr(logs, 'credentials', lambda: [PASSWORD])
+        formatter = logs.RedactingFormatter(logging.Formatter('%(message)s'))
+        assert formatter.format(make_record(f'password={PASSWORD};')) == 'password=***;'
+
+    def test_without_credentials(self, monkeypatch):
+        monkeypatch.setattr(logs, 'credentials', lambda: [])
+        assert logs.redact('nothing to hide') == 'nothing to hide'
@@ -0,0 +1,85 @@
+import pytest
+from selenium.common.exceptions import StaleElementReferenceException
+
+from protonmail_auto import scripts
+from protonmail_auto.element_cache import ElementCache
+from protonmail_auto.items_table import ItemRow
+from protonmail_auto.pages import SettingsFoldersPage
+
+RED = 'color: rgb(207, 88, 88);'
+BLUE = 'color: rgb(114, 114, 167);'
+
+
+class FakeDriver:
+    """
+    Answers check of cached row with given results, an exception result is raised
+    """
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.checked = []
+
+    def execute_script(self, script, *args):
+        assert script == scripts.ITEM_ROW_CHECK
+        self.checked.append(args[:2])
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def make_page(driver, found=None):
+    """
+    Settings page with row of folder1 in cache, find_item returns found row
+    """
+    page = SettingsFoldersPage.__new__(SettingsFoldersPage)
+    page.driver = driver
+    page._cache = ElementCache()
+    page._bulk = False
+    page._cache.put((page.ROW, 'folder1'), ItemRow('row1', 0, 'folder1', 'folder', RED))
+    page.find_item = lambda name: found
+    return page
+
+
+def record(element, index, name, color):
+    return {'element': element, 'index': index, 'name': name, 'item_type': 'folder', 'color': color}
+
+
+class TestsCheckedRow:
+    def test_current_color_and_index(self):
+        driver = FakeDriver(record('row1', 2, 'folder1', BLUE))
+        page = make_page(driver)
+        assert page._get_item_index('folder1') == 2
+        assert driver.checked == [('row1', 'folder1')]
+        assert page._cached_row('folder1').color == BLUE
+
+    def test_other_item_in_row(self):
+        # row was re-rendered for another item, check returns null
+        found = ItemRow('row5', 5, 'folder1', 'folder', BLUE)
+        page = make_page(FakeDriver(None), found)
+        assert page._get_item_index('folder1') == 5
+        assert page._cached_row('folder1') == found
+
+    def test_stale_row(self):
+        found = ItemRow('row3', 3, 'folder1', 'folder', BLUE)
+        page = make_page(FakeDriver(StaleElementReferenceException('stale')), found)
+        assert page._find_item_by_name('folder1') == 'row3'
+
+    def test_removed_item(self):
+        page = make_page(FakeDriver(None))
+        assert page._get_item_index('folder1') is None
+        assert page._cached_row('folder1') is None
+
+
+class TestsItemColor:
+    @pytest.mark.parametrize('rendered, expected, correct', [
+        (RED, 'rgb(207, 88, 88)', True),
+        (RED, BLUE, False),
+        # not a color on either side
+        ('', 'RGB_TYPO', False),
+        (RED, 'RGB_TYPO', False),
+        ('', 'rgb(207, 88, 88)', False),
+    ])
+    def test_color(self, rendered, expected, correct):
+        page = make_page(FakeDriver(record('row1', 0, 'folder1', rendered)))
+        assert page.item_color_is_correct('folder1', expected) is correct
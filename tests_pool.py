@@ -0,0 +1,124 @@
+import threading
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from protonmail_auto.config import Config
+from protonmail_auto.pool import BrowserPool, PoolError
+
+
+class FakeDriver:
+    def __init__(self, number):
+        self.number = number
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+class Factory:
+    """
+    Starts numbered fake browsers. If gate is set, start waits for it
+    """
+
+    def __init__(self, fail=0, gate=None):
+        self.started = []
+        self.fail = fail
+        self.gate = gate
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        if self.gate:
+            self.gate.wait(5)
+        with self._lock:
+            if self.fail:
+                self.fail -= 1
+                raise PoolError('Failed to log in')
+            self.started.append(FakeDriver(len(self.started) + 1))
+            return self.started[-1]
+
+
+@pytest.fixture(autouse=True)
+def no_browser(monkeypatch):
+    monkeypatch.setattr(Config, 'HEALTH_CHECK', 0)
+    monkeypatch.setattr(BrowserPool, 'reset', staticmethod(lambda driver: None))
+
+
+def make_pool(factory, size=1, max_leases=10):
+    return BrowserPool(size=size, max_leases=max_leases, factory=factory)
+
+
+class TestsBrowserPool:
+    def test_browser_is_reused(self):
+        factory = Factory()
+        pool = make_pool(factory)
+        with pool.lease() as first:
+            pass
+        with pool.lease() as second:
+            assert second is first
+        assert len(factory.started) == 1 and not first.quit_called
+
+    def test_unhealthy_browser_is_recycled(self):
+        factory = Factory()
+        pool = make_pool(factory)
+        with pytest.raises(WebDriverException):
+            with pool.lease():
+                raise WebDriverException('chrome not reachable')
+        first = factory.started[0]
+        assert first.quit_called
+        assert pool.acquire(timeout=5) is factory.started[1]
+
+    def test_test_failure_keeps_browser(self):
+        factory = Factory()
+        pool = make_pool(factory)
+        with pytest.raises(AssertionError):
+            with pool.lease():
+                raise AssertionError('wrong color')
+        assert pool.acquire(timeout=5) is factory.started[0]
+
+    def test_recycled_after_max_leases(self):
+        factory = Factory()
+        pool = make_pool(factory, max_leases=2)
+        for _ in range(2):
+            with pool.lease():
+                pass
+        assert factory.started[0].quit_called
+        assert pool.acquire(timeout=5).number == 2
+
+    def test_failed_start_is_retried(self):
+        factory = Factory(fail=1)
+        pool = make_pool(factory)
+        with pytest.raises(PoolError, match='Failed to start browser'):
+            pool.acquire(timeout=5)
+        assert pool.acquire(timeout=5).number == 1
+
+    def test_lease_timeout(self):
+        pool = make_pool(Factory())
+        pool.acquire(timeout=5)
+        with pytest.raises(PoolError, match='Timeout'):
+            pool.acquire(timeout=0.1)
+
+    def test_close_quits_idle_and_leased(self):
+        factory = Factory()
+        pool = make_pool(factory, size=2)
+        leased = pool.acquire(timeout=5)
+        pool.close()
+        assert len(factory.started) == 2
+        assert all(driver.quit_called for driver in factory.started)
+        assert leased.quit_called
+
+    def test_cancel_quits_browsers_being_started(self):
+        gate = threading.Event()
+        factory = Factory(gate=gate)
+        pool = make_pool(factory, size=2)
+        pool.prewarm()
+        starting = list(pool._threads)
+        pool.cancel()
+        gate.set()
+        for thread in starting:
+            thread.join()
+        assert len(factory.started) == 2 and all(driver.quit_called for driver in factory.started)
+        # pool can be started again
+        with pool.lease() as driver:
+            assert not driver.quit_called and driver not in factory.started[:2]
+        pool.close()
@@ -0,0 +1,174 @@
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+from protonmail_auto.scheduler import Scheduler, SchedulerError, StateGraph
+
+
+class Item:
+    """
+    Collected test with state marker
+    """
+
+    def __init__(self, name, produces=(), consumes=()):
+        self.name = self.originalname = name
+        self.nodeid = f'tests.py::{name}'
+        self.marker = pytest.mark.state(produces=produces, consumes=consumes).mark if produces or consumes else None
+
+    def get_closest_marker(self, name):
+        return self.marker if name == 'state' else None
+
+
+def names(items):
+    return [item.name for item in items]
+
+
+class TestsStateGraph:
+    def test_producers_first(self):
+        items = [Item('edit', consumes='folder1', produces='folder1_modified'),
+                 Item('delete', consumes='folder1_modified'),
+                 Item('independent'),
+                 Item('add', produces='folder1')]
+        assert names(StateGraph(items).order()) == ['independent', 'add', 'edit', 'delete']
+
+    def test_collection_order_is_kept(self):
+        items = [Item('a'), Item('b', produces='x'), Item('c', consumes='x'), Item('d')]
+        assert names(StateGraph(items).order()) == ['a', 'b', 'c', 'd']
+
+    def test_unknown_and_own_states_are_ignored(self):
+        graph = StateGraph([Item('a', consumes=('external', 'own'), produces='own')])
+        assert graph.requires == {'tests.py::a': set()}
+        assert names(graph.order()) == ['a']
+
+    def test_state_produced_twice(self):
+        with pytest.raises(SchedulerError, match='"x" is produced by'):
+            StateGraph([Item('a', produces='x'), Item('b', produces='x')])
+
+    def test_cycle(self):
+        with pytest.raises(SchedulerError, match='Dependency cycle'):
+            StateGraph([Item('a', produces='x', consumes='y'), Item('b', produces='y', consumes='x')]).order()
+
+    def test_chains(self):
+        items = [Item('add_folder', produces='folder1'),
+                 Item('edit_folder', consumes='folder1', produces='folder1_modified'),
+                 Item('delete_folder', consumes='folder1_modified'),
+                 Item('add_label', produces='label1'),
+                 Item('delete_label', consumes='label1'),
+                 Item('standalone')]
+        chains = StateGraph(items).chains()
+        assert 'tests.py::standalone' not in chains
+        folders = {chains[f'tests.py::{name}'] for name in ('add_folder', 'edit_folder', 'delete_folder')}
+        labels = {chains[f'tests.py::{name}'] for name in ('add_label', 'delete_label')}
+        assert folders == {'chain-add_folder'} and labels == {'chain-add_label'}
+
+
+class Report:
+    def __init__(self, item, outcome, when='call'):
+        self.nodeid = item.nodeid
+        self.when = when
+        self.failed = outcome == 'failed'
+        self.skipped = outcome == 'skipped'
+
+
+class TestsScheduler:
+    def test_consumers_of_failed_producer_are_skipped(self):
+        add, edit, delete = (Item('add', produces='x'), Item('edit', consumes='x', produces='y'),
+                             Item('delete', consumes='y'))
+        items = [delete, edit, add]
+        groups = {}
+        scheduler = Scheduler()
+        scheduler.modify_items(items, lambda item, chain: groups.setdefault(item.name, chain))
+        assert names(items) == ['add', 'edit', 'delete']
+        assert set(groups.values()) == {'chain-add'} and len(groups) == 3
+
+        assert scheduler.skip_reason(add) is None
+        scheduler.record(Report(add, 'failed'))
+        assert scheduler.skip_reason(edit) == 'producer failed: tests.py::add'
+        # skipped consumer skips its consumers too
+        scheduler.record(Report(edit, 'skipped', 'setup'))
+        assert scheduler.skip_reason(delete) == 'producer failed: tests.py::edit'
+
+    def test_teardown_skip_is_not_failure(self):
+        add, edit = Item('add', produces='x'), Item('edit', consumes='x')
+        scheduler = Scheduler()
+        scheduler.modify_items([add, edit], lambda item, chain: None)
+        scheduler.skip_reason(add)
+        scheduler.record(Report(add, 'passed'))
+        scheduler.record(Report(add, 'skipped', 'teardown'))
+        assert scheduler.skip_reason(edit) is None
+
+
+CHAINS_TESTS = '''
+import os
+import json
+import time
+
+import pytest
+
+
+def run(name, fail=False):
+    started = time.time()
+    time.sleep(1)
+    with open(f'{name}.json', 'w') as w_file:
+        json.dump({'worker': os.environ.get('PYTEST_XDIST_WORKER'), 'start': started, 'end': time.time()}, w_file)
+    assert not fail
+
+
+@pytest.mark.state(consumes='folder1')
+def test_delete_folder():
+    run('delete_folder')
+
+
+@pytest.mark.state(produces='folder1')
+def test_add_folder():
+    run('add_folder')
+
+
+@pytest.mark.state(produces='label1')
+def test_add_label():
+    run('add_label')
+
+
+@pytest.mark.state(consumes='label1')
+def test_delete_label():
+    run('delete_label')
+
+
+@pytest.mark.state(produces='broken')
+def test_add_broken():
+    run('add_broken', fail=True)
+
+
+@pytest.mark.state(consumes='broken')
+def test_use_broken():
+    run('use_broken')
+'''
+
+
+class TestsParallelRun:
+    def test_chains_run_on_separate_workers(self, tmp_path):
+        pytest.importorskip('xdist')
+        (tmp_path / 'test_chains.py').write_text(CHAINS_TESTS)
+        (tmp_path / 'pytest.ini').write_text('[pytest]\nmarkers =\n    state(produces, consumes): test state\n')
+        root = os.path.dirname(os.path.abspath(__file__))
+        # hooks of conftest of this repo order tests and put chains to xdist groups
+        result = subprocess.run([sys.executable, '-m', 'pytest', '-p', 'conftest', '-n', '2', '--dist', 'loadgroup',
+                                 '-q', '-p', 'no:cacheprovider', 'test_chains.py'],
+                                cwd=tmp_path, capture_output=True, text=True, timeout=300,
+                                env={**os.environ, 'PYTHONPATH': root})
+        output = result.stdout + result.stderr
+        assert '1 failed, 4 passed, 1 skipped' in output, output
+
+        runs = {path.stem: json.loads(path.read_text()) for path in tmp_path.glob('*.json')}
+        assert 'use_broken' not in runs
+        assert runs['add_folder']['end'] <= runs['delete_folder']['start']
+        assert runs['add_label']['end'] <= runs['delete_label']['start']
+        assert runs['add_folder']['worker'] == runs['delete_folder']['worker']
+        assert runs['add_label']['worker'] == runs['delete_label']['worker']
+        assert runs['add_folder']['worker'] != runs['add_label']['worker']
+        # chains overlap in time
+        assert runs['add_folder']['start'] < runs['delete_label']['end']
+        assert runs['add_label']['start'] < runs['delete_folder']['end']
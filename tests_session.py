@@ -0,0 +1,35 @@
+import os
+
+from protonmail_auto.session import SessionStore
+
+USERNAME = 'qa.user@example.com'
+
+
+class FakeDriver:
+    current_url = 'https://host/settings/labels'
+
+    def get_cookies(self):
+        return [{'name': 'AUTH', 'value': 'cookie'}]
+
+    def execute_script(self, script, *args):
+        return {'local': {}, 'session': {}}
+
+
+def make_store(tmp_path, username=USERNAME):
+    return SessionStore(username=username, ttl=60, directory=str(tmp_path), base_url='https://host')
+
+
+class TestsSessionStore:
+    def test_username_is_not_saved(self, tmp_path):
+        store = make_store(tmp_path)
+        store.save(FakeDriver())
+        with open(store.path, encoding='utf-8') as r_file:
+            assert USERNAME not in r_file.read()
+        assert store.load()['cookies'] == [{'name': 'AUTH', 'value': 'cookie'}]
+
+    def test_session_of_other_user(self, tmp_path):
+        store = make_store(tmp_path)
+        store.save(FakeDriver())
+        other = make_store(tmp_path, 'other.user@example.com')
+        os.replace(store.path, other.path)
+        assert other.load() is None
@@ -1,10 +1,15 @@
 import os
+import random
 import logging
 import pytest
-from selenium import webdriver
 
+from protonmail_auto import artifacts
+from protonmail_auto import logs
 from protonmail_auto.pages import SettingsFoldersPage, LoginPage
-from protonmail_auto.config import Config
+from protonmail_auto.browser import create_driver
+from protonmail_auto.namespace import Namespace, run_id, worker_id
+from protonmail_auto.pool import PoolError, get_pool
+from protonmail_auto.sweeper import sweep_leftovers, sweep_namespace
 from protonmail_auto.locators import ColorsLocators, ColorsMap
 
 
@@ -19,7 +24,7 @@ def log_test_headline(msg):
     :return:
     """
     logging.info('=' * 40)
-    logging.info(f"\t\t\t{msg.upper()}")
+    logging.info('\t\t\t%s', msg.upper())
     logging.info('=' * 40)
 
 
@@ -41,35 +46,78 @@ def report_fail(msg, driver=None, screenshot_name=''):
 
 def make_screenshot(driver, screenshot_name):
     """
-    save screenshot to Config.DATA_DIR
+    capture screenshot with DOM and console log to archive of current test.
+    Archive is written to Config.DATA_DIR in background
     :param driver: selenium.webdriver
     :param screenshot_name:
     :return: None
     """
-    if not os.path.exists(Config.DATA_DIR):
-        os.mkdir(Config.DATA_DIR)
-    screenshot = os.path.join(Config.DATA_DIR, screenshot_name)
-    driver.save_screenshot(screenshot)
+    artifacts.capture(driver, screenshot_name)
 
 
-@pytest.fixture(scope="class")
-def driver():
+@pytest.fixture(scope='function', autouse=True)
+def failure_artifacts(request):
+    """
+    Collect artifacts of test to one archive
+    :return:
+    """
+    artifacts.start(request.node.name)
+    yield
+    artifacts.finish()
+
+
+@pytest.fixture(scope="session")
+def namespace():
+    """
+    Prefix for names of items created by tests.
+    Unique per test run and pytest-xdist worker
+    :return: Namespace
+    """
+    return Namespace()
+
+
+@pytest.fixture(scope="session")
+def browser_pool(request, namespace):
+    """
+    Pool of logged in browsers, started in conftest.
+    With --sweep items of stale previous runs are deleted during tests on own browser.
+    Items left in namespace are deleted at the end of session
+    :return: BrowserPool
+    """
+    pool = get_pool()
+    leftovers = None
+    if request.config.getoption('sweep') and worker_id() in ('master', 'gw0'):
+        leftovers = sweep_leftovers()
+    yield pool
+    try:
+        with pool.lease() as driver:
+            sweep_namespace(driver, namespace)
+    except PoolError as exc:
+        logging.warning(f'Cleanup skipped: {exc}')
+    if leftovers is not None:
+        try:
+            logging.info(f'Sweep of previous runs: {leftovers.result()}')
+        except Exception:
+            # logged by sweeper
+            pass
+    pool.close()
+
+
+@pytest.fixture(scope="function")
+def driver(request, browser_pool):
     """
     pytest fixture used by tests.
-    Open browser, login, got to Settings Folder/Labels page
+    Lease logged in browser opened on Settings Folder/Labels page.
+    Each pytest-xdist worker has its own pool of browsers,
+    browser is restarted if test failed with WebDriverException
     :return:
     """
-    logging.info('\t\t Initializing "driver" fixture')
-    driver = webdriver.Chrome(Config.CHROME_PATH)
-    logging.info('Webdriver initialized')
-    login_page = LoginPage(driver)
-    logged_in = login_page.login()
-    if logged_in:
-        settings_page = SettingsFoldersPage(driver)
-        settings_page.go_to_settings_page()
-        yield driver
-    else:
-        raise SetupException('Failed to log in')
+    try:
+        leased = browser_pool.acquire()
+    except PoolError as exc:
+        raise SetupException(str(exc))
+    yield leased
+    browser_pool.release(leased, healthy=not getattr(request.node, 'webdriver_failed', False))
 
 
 @pytest.fixture(scope='function')
@@ -86,26 +134,35 @@ class TestsFoldersLabels:
     Preconditions:
     Perfectly it would be great to have predefined test data, but for testing beta
     no Labels or Folders should exist with names folder1, folder1_modified
-    label1, label1_modified
+    label1, label1_modified in namespace of test run (see Namespace).
+    Leftovers of previous runs can be removed with: pytest --sweep
+
+    Tests declare items they produce/consume (see protonmail_auto.scheduler),
+    independent folders and labels chains run in parallel with: pytest -n 2 --dist loadgroup
     """
-    # get random colors to cover more cases
-    FOLDER_COLOR1 = ColorsLocators.get_random()
-    FOLDER_COLOR2 = ColorsLocators.get_random()
-    LABEL_COLOR1 = ColorsLocators.get_random()
-    LABEL_COLOR2 = ColorsLocators.get_random()
-
-    @pytest.mark.parametrize("foldername,color", [("folder1", FOLDER_COLOR1)])
-    def test_add_folder(self, driver, foldername, color):
+    # get random colors to cover more cases. Seeded by run id, so all pytest-xdist workers of run get the same
+    # colors, test ids do not contain colors: workers must collect the same ids
+    _colors = random.Random(run_id())
+    FOLDER_COLOR1 = ColorsLocators.get_random(_colors)
+    FOLDER_COLOR2 = ColorsLocators.get_random(_colors)
+    LABEL_COLOR1 = ColorsLocators.get_random(_colors)
+    LABEL_COLOR2 = ColorsLocators.get_random(_colors)
+
+    @pytest.mark.state(produces='folder1')
+    @pytest.mark.parametrize("foldername,color", [("folder1", FOLDER_COLOR1)], ids=["folder1"])
+    def test_add_folder(self, driver, namespace, foldername, color):
         """
         Click on Add Folder, select name and color, click on Submit.
         Check success notification, folder is displayed, color is correct
         :param driver:
+        :param namespace:
         :param foldername:
         :param color:
         :return:
         """
         test_name = 'test_add_folder'
         log_test_headline('Test add folder')
+        foldername = namespace.name(foldername)
         logging.info(f'Parameters: labelname={foldername}, color={color} ')
 
         settings_page = SettingsFoldersPage(driver)
@@ -127,13 +184,16 @@ class TestsFoldersLabels:
         if fail_msg:
             report_fail(fail_msg)
 
+    @pytest.mark.state(consumes='folder1', produces='folder1_modified')
     @pytest.mark.parametrize("foldername, new_foldername, new_color",
-                             [('folder1', 'folder1_modified', FOLDER_COLOR2)])
-    def test_edit_folder(self, driver, foldername, new_foldername, new_color):
+                             [('folder1', 'folder1_modified', FOLDER_COLOR2)],
+                             ids=['folder1-folder1_modified'])
+    def test_edit_folder(self, driver, namespace, foldername, new_foldername, new_color):
         """
         Click on Edit Folder, modify name and color, click on Submit.
         Check success notification, folder with new name is displayed, color is correct
         :param driver:
+        :param namespace:
         :param foldername:
         :param new_foldername:
         :param new_color:
@@ -141,6 +201,8 @@ class TestsFoldersLabels:
         """
         test_name = 'test_edit_folder'
         log_test_headline('Test edit folder')
+        foldername = namespace.name(foldername)
+        new_foldername = namespace.name(new_foldername)
         logging.info(f'Parameters: labelname={foldername}, new_labelname={new_foldername}, new_color={new_color} ')
 
         settings_page = SettingsFoldersPage(driver)
@@ -162,17 +224,20 @@ class TestsFoldersLabels:
         if fail_msg:
             report_fail(fail_msg)
 
+    @pytest.mark.state(consumes='folder1_modified')
     @pytest.mark.parametrize("foldername", ['folder1_modified'])
-    def test_delete_folder(self, driver, foldername):
+    def test_delete_folder(self, driver, namespace, foldername):
         """
         Click on Delete Folder,  click on Submit.
         Check success notification, folder is not displayed
         :param driver:
+        :param namespace:
         :param foldername:
         :return:
         """
         test_name = 'test_delete_folder'
         log_test_headline('Test delete folder')
+        foldername = namespace.name(foldername)
         logging.info(f'Parameters: labelname={foldername}')
 
         settings_page = SettingsFoldersPage(driver)
@@ -189,18 +254,21 @@ class TestsFoldersLabels:
         if fail_msg:
             report_fail(fail_msg)
 
-    @pytest.mark.parametrize("labelname, color", [("label1", LABEL_COLOR1)])
-    def test_add_label(self, driver, labelname, color):
+    @pytest.mark.state(produces='label1')
+    @pytest.mark.parametrize("labelname, color", [("label1", LABEL_COLOR1)], ids=["label1"])
+    def test_add_label(self, driver, namespace, labelname, color):
         """
         Click on Add Label , select name and color, click on Submit.
         Check success notification, label is displayed, color is correct
         :param driver:
+        :param namespace:
         :param labelname:
         :param color:
         :return:
         """
         test_name = 'test_add_label'
         log_test_headline('Test add label')
+        labelname = namespace.name(labelname)
         logging.info(f'Parameters: labelname={labelname}, color={color} ')
 
         settings_page = SettingsFoldersPage(driver)
@@ -222,13 +290,16 @@ class TestsFoldersLabels:
         if fail_msg:
             report_fail(fail_msg)
 
+    @pytest.mark.state(consumes='label1', produces='label1_modified')
     @pytest.mark.parametrize("labelname, new_labelname, new_color",
-                             [('label1', 'label1_modified', LABEL_COLOR2)])
-    def test_edit_label(self, driver, labelname, new_labelname, new_color):
+                             [('label1', 'label1_modified', LABEL_COLOR2)],
+                             ids=['label1-label1_modified'])
+    def test_edit_label(self, driver, namespace, labelname, new_labelname, new_color):
         """
         Click on Edit Label, modify name and color, click on Submit.
         Check success notification, label with new name is displayed, color is correct
         :param driver:
+        :param namespace:
         :param labelname:
         :param new_labelname:
         :param new_color:
@@ -236,6 +307,8 @@ class TestsFoldersLabels:
         """
         test_name = 'test_edit_label'
         log_test_headline('Test edit label')
+        labelname = namespace.name(labelname)
+        new_labelname = namespace.name(new_labelname)
         logging.info(f'Parameters: labelname={labelname}, new_labelname={new_labelname}, new_color={new_color} ')
 
         settings_page = SettingsFoldersPage(driver)
@@ -257,17 +330,20 @@ class TestsFoldersLabels:
         if fail_msg:
             report_fail(fail_msg)
 
+    @pytest.mark.state(consumes='label1_modified')
     @pytest.mark.parametrize("labelname", ['label1_modified'])
-    def test_delete_label(self, driver, labelname):
+    def test_delete_label(self, driver, namespace, labelname):
         """
         Click on Delete Label, click on Submit.
         Check success notification, label is not displayed
         :param driver:
+        :param namespace:
         :param labelname:
         :return:
         """
         test_name = 'test_delete_label'
         log_test_headline('Test delete label')
+        labelname = namespace.name(labelname)
         logging.info(f'Parameters: labelname={labelname}')
 
         settings_page = SettingsFoldersPage(driver)
@@ -284,6 +360,46 @@ class TestsFoldersLabels:
         if fail_msg:
             report_fail(fail_msg)
 
+    @pytest.mark.xdist_group('bulk')
+    @pytest.mark.parametrize("count", [5])
+    def test_bulk_add_delete(self, driver, namespace, count):
+        """
+        Add folders and labels with add_items, delete them with delete_items.
+        Check every item got notification, colors and table state
+        :param driver:
+        :param namespace:
+        :param count: number of items of each type
+        :return:
+        """
+        test_name = 'test_bulk_add_delete'
+        log_test_headline('Test bulk add delete')
+        logging.info(f'Parameters: count={count}')
+
+        items = [(namespace.name(f'bulk_{item_type}{i}'), getattr(ColorsLocators, ColorsLocators.get_random()), item_type)
+                 for item_type in ('folder', 'label') for i in range(count)]
+        settings_page = SettingsFoldersPage(driver)
+
+        fail_msg = ''
+        report = settings_page.add_items(items)
+        logging.info(f'Report: {report}')
+        if not report.ok:
+            make_screenshot(driver, f'{test_name}_add.png')
+            fail_msg += f'Failed to add: {report.failed()}'
+
+        colors_diff = settings_page.verify_colors({name: color for name, color, _ in items})
+        if not colors_diff.ok:
+            make_screenshot(driver, f'{test_name}_color.png')
+            fail_msg += f'Wrong colors: {colors_diff.mismatches()}, not found: {colors_diff.missing()}'
+
+        report = settings_page.delete_items([name for name, _, _ in items])
+        logging.info(f'Report: {report}')
+        if not report.ok:
+            make_screenshot(driver, f'{test_name}_delete.png')
+            fail_msg += f'Failed to delete: {report.failed()}'
+
+        if fail_msg:
+            report_fail(fail_msg)
+
     # # TODO. not covered
     # def test_add_folder_cancel(self):
     #     pass
@@ -318,12 +434,11 @@ class TestsFoldersLabels:
 
 
 def init_logging():
-    logging.basicConfig(level=logging.INFO, filename='../log.log')
-    logging.getLogger().addHandler(logging.StreamHandler())
+    logs.start(os.path.join('..', 'log.jsonl'), console=True)
 
 
 def main():
-    driver = webdriver.Chrome(Config.CHROME_PATH)
+    driver = create_driver()
     logging.info('Webdriver initialized')
     login_page = LoginPage(driver)
     login_page.login()
@@ -346,4 +461,7 @@ def main():
 
 if __name__ == '__main__':
     init_logging()
-    main()
+    try:
+        main()
+    finally:
+        logs.stop()
@@ -0,0 +1,61 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from protonmail_auto.standin import AUTH_COOKIE, StandInServer
+
+
+@pytest.fixture(scope='module')
+def server():
+    with StandInServer(items=4, welcome_dialog=False) as standin:
+        yield standin
+
+
+def request(server, path, method='GET', data=None, cookie=None):
+    """
+    :return: tuple (status, body)
+    """
+    body = json.dumps(data).encode('utf-8') if data is not None else None
+    req = urllib.request.Request(server.url + path, data=body, method=method)
+    if cookie:
+        req.add_header('Cookie', cookie)
+    try:
+        with urllib.request.urlopen(req) as response:
+            return response.status, response.read().decode('utf-8')
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.read().decode('utf-8')
+
+
+class TestsStandIn:
+    def test_items_crud(self, server):
+        status, body = request(server, '/api/items', 'POST', {'name': 'crud', 'color': '#7272a7', 'type': 'label'})
+        assert status == 201
+        item = json.loads(body)
+        assert item['name'] == 'crud' and item['type'] == 'label'
+
+        status, body = request(server, f'/api/items/{item["id"]}', 'PUT', {'name': 'crud2', 'color': '#8989ac'})
+        assert status == 200 and json.loads(body)['name'] == 'crud2'
+
+        assert request(server, f'/api/items/{item["id"]}', 'DELETE')[0] == 200
+        assert request(server, f'/api/items/{item["id"]}', 'DELETE')[0] == 404
+        names = [i['name'] for i in json.loads(request(server, '/api/items')[1])]
+        assert 'crud2' not in names and len(names) == 4
+
+    @pytest.mark.parametrize('path', ['/api/other/1', '/1', '/api/items', '/api/items/x', '/api/items/1/2'])
+    def test_put_delete_need_item_path(self, server, path):
+        before = request(server, '/api/items')[1]
+        assert request(server, path, 'PUT', {'name': 'changed'})[0] == 404
+        assert request(server, path, 'DELETE')[0] == 404
+        assert request(server, '/api/items')[1] == before
+
+    def test_protected_page_redirects_to_login(self, server):
+        status, body = request(server, '/settings/labels')
+        # urllib follows redirect
+        assert status == 200 and 'id="password"' in body
+        status, body = request(server, '/settings/labels', cookie=AUTH_COOKIE)
+        assert status == 200 and 'folders/labels' in body
+
+    def test_unknown_page(self, server):
+        assert request(server, '/nope')[0] == 404
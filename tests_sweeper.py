@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+
+from protonmail_auto.namespace import Namespace, run_id
+from protonmail_auto.sweeper import Sweeper, leftovers_pattern, namespace_pattern
+
+NOW = 1600000000
+
+
+class TestsSweeper:
+    def test_namespace_pattern(self):
+        namespace = Namespace('run1', 'gw0', NOW)
+        sweeper = Sweeper(namespace_pattern(namespace))
+        assert sweeper.matches(namespace.name('folder1'))
+        assert not sweeper.matches(Namespace('run1', 'gw1', NOW).name('folder1'))
+        assert not sweeper.matches('folder1')
+        assert not sweeper.matches(None)
+
+    @pytest.mark.parametrize('name, removed', [
+        (Namespace('old', 'gw0', NOW - 7200).name('folder1'), True),
+        # other run which may still be going on
+        (Namespace('other', 'gw1', NOW - 60).name('folder1'), False),
+        # current run is never swept
+        (Namespace(run_id(), 'gw0', NOW - 7200).name('folder1'), False),
+        # age of item cannot be told
+        ('qa-old-gw0-folder1', False),
+        ('folder1', False),
+    ])
+    def test_leftovers_need_age(self, name, removed):
+        assert Sweeper(leftovers_pattern(), min_age=3600).matches(name, now=NOW) is removed
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+class TestsSweepInBackground:
+    def test_own_browser(self, monkeypatch):
+        drivers, threads = [], []
+
+        def factory():
+            threads.append(threading.current_thread().name)
+            drivers.append(FakeDriver())
+            return drivers[-1]
+
+        monkeypatch.setattr(Sweeper, 'sweep', lambda self, driver: f'report of {driver is drivers[0]}')
+        future = Sweeper(leftovers_pattern()).sweep_in_background(factory)
+        assert future.result(timeout=5) == 'report of True'
+        assert threads == ['sweeper']
+        assert drivers[0].quit_called
+
+    def test_browser_quit_after_failure(self, monkeypatch):
+        driver = FakeDriver()
+
+        def sweep(self, driver):
+            raise RuntimeError('table not loaded')
+
+        monkeypatch.setattr(Sweeper, 'sweep', sweep)
+        future = Sweeper(leftovers_pattern()).sweep_in_background(lambda: driver)
+        with pytest.raises(RuntimeError):
+            future.result(timeout=5)
+        assert driver.quit_called
+
+    def test_browser_not_started(self):
+        def factory():
+            raise RuntimeError('Failed to log in')
+
+        with pytest.raises(RuntimeError, match='Failed to log in'):
+            Sweeper(leftovers_pattern()).sweep_in_background(factory).result(timeout=5)
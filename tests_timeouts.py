@@ -0,0 +1,91 @@
+import json
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from protonmail_auto import waits
+from protonmail_auto.config import Config
+from protonmail_auto.timeouts import MIN_SAMPLES, TimeoutPolicy, percentile
+
+
+@pytest.fixture
+def policy(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'ADAPTIVE_TIMEOUTS', 1)
+    monkeypatch.setattr(Config, 'TIMEOUT_PERCENTILE', 99.0)
+    monkeypatch.setattr(Config, 'TIMEOUT_MARGIN', 0.5)
+    monkeypatch.setattr(Config, 'TIMEOUT_MIN', 1.0)
+    monkeypatch.setattr(Config, 'TIMEOUT_MAX', 30.0)
+    monkeypatch.delenv('PYTEST_XDIST_WORKER', raising=False)
+    return TimeoutPolicy(str(tmp_path / 'wait_latency.json'))
+
+
+class TimingOutDriver:
+    """
+    Wait script of driver never finds condition
+    """
+    _wait_script_timeout = 100
+
+    def execute_async_script(self, script, *args):
+        raise TimeoutException('script timeout')
+
+
+class TestsPercentile:
+    @pytest.mark.parametrize('percent, expected', [(0, 1), (50, 5), (90, 9), (99, 10), (100, 10)])
+    def test_nearest_rank(self, percent, expected):
+        assert percentile(list(range(10, 0, -1)), percent) == expected
+
+    def test_single_sample(self):
+        assert percentile([3.5], 99) == 3.5
+
+
+class TestsTimeoutPolicy:
+    def test_default_until_enough_samples(self, policy):
+        for _ in range(MIN_SAMPLES - 1):
+            policy.observe('site', 2.0)
+        assert policy.timeout('site', 5) == 5
+        policy.observe('site', 2.0)
+        assert policy.timeout('site', 5) == 2.5
+
+    def test_limited_by_min_and_max(self, policy):
+        for _ in range(MIN_SAMPLES):
+            policy.observe('fast', 0.01)
+            policy.observe('slow', 100.0)
+        assert policy.timeout('fast', 5) == Config.TIMEOUT_MIN
+        assert policy.timeout('slow', 5) == Config.TIMEOUT_MAX
+
+    def test_disabled(self, policy, monkeypatch):
+        monkeypatch.setattr(Config, 'ADAPTIVE_TIMEOUTS', 0)
+        for _ in range(MIN_SAMPLES):
+            policy.observe('site', 2.0)
+        assert policy.timeout('site', 5) == 5
+
+    def test_timed_out_waits_are_not_recorded(self, policy, monkeypatch):
+        monkeypatch.setattr(waits, 'policy', policy)
+        for _ in range(100):
+            policy.observe('site', 1.0)
+        timeout = policy.timeout('site', 5)
+        for _ in range(20):
+            with pytest.raises(TimeoutException):
+                waits.wait_for_any(TimingOutDriver(), {'title': waits.title_is('Title')}, site='site')
+        assert policy.timeout('site', 5) == timeout
+
+    def test_workers_save_own_files(self, policy, tmp_path, monkeypatch):
+        for worker, seconds in (('gw0', 1.0), ('gw1', 3.0)):
+            monkeypatch.setenv('PYTEST_XDIST_WORKER', worker)
+            worker_policy = TimeoutPolicy(policy.path)
+            for _ in range(MIN_SAMPLES):
+                worker_policy.observe('site', seconds)
+            worker_policy.save()
+        assert sorted(p.name for p in tmp_path.iterdir()) == ['wait_latency_gw0.json', 'wait_latency_gw1.json']
+        assert json.loads((tmp_path / 'wait_latency_gw1.json').read_text()) == {'site': [3.0] * MIN_SAMPLES}
+        # history of all workers is merged on read
+        assert TimeoutPolicy(policy.path).timeout('site', 5) == 3.5
+
+    def test_save_appends_to_history(self, policy):
+        policy.observe('site', 1.0)
+        policy.save()
+        policy.observe('site', 2.0)
+        policy.save()
+        policy.save()
+        with open(policy.path, encoding='utf-8') as r_file:
+            assert json.load(r_file) == {'site': [1.0, 2.0]}
@@ -0,0 +1,148 @@
+import gzip
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.webelement import WebElement
+
+from protonmail_auto import scripts
+from protonmail_auto import trace
+from protonmail_auto.trace import ELEMENT_KEY, Replayer, TraceWriter, diff, read_trace, slowdowns
+
+USERNAME = 'qa.user'
+PASSWORD = 's3cret-pass'
+COOKIE = 'AUTH-cookie-value'
+TOKEN = 'storage-token-value'
+
+
+@pytest.fixture
+def writer(tmp_path, monkeypatch):
+    monkeypatch.setattr(trace, 'credentials', lambda: [USERNAME, PASSWORD])
+    trace_writer = TraceWriter(str(tmp_path / 'trace.jsonl.gz'))
+    yield trace_writer
+    trace_writer.close()
+
+
+def command(writer, name, params=None, value=None, start=0.0, elapsed=0.01, test='tests.py::test', error=None):
+    writer.command(test, name, params, writer.started + start, elapsed, 'page.method', value, error)
+
+
+def element(id_):
+    return {ELEMENT_KEY: id_}
+
+
+class TestsTraceRedaction:
+    def test_no_secrets_in_trace(self, writer):
+        command(writer, Command.SEND_KEYS_TO_ELEMENT, {'id': 'e1', 'text': PASSWORD, 'value': list(PASSWORD)})
+        command(writer, Command.SEND_KEYS_TO_ELEMENT, {'id': 'e2', 'text': USERNAME, 'value': list(USERNAME)})
+        command(writer, Command.ADD_COOKIE, {'cookie': {'name': 'AUTH', 'value': COOKIE, 'path': '/'}})
+        command(writer, Command.GET_ALL_COOKIES, {}, [{'name': 'AUTH', 'value': COOKIE}])
+        command(writer, Command.W3C_EXECUTE_SCRIPT, {'script': scripts.STORAGE_DUMP, 'args': []},
+                {'local': {'token': TOKEN}, 'session': {}})
+        command(writer, Command.W3C_EXECUTE_SCRIPT, {'script': scripts.STORAGE_RESTORE,
+                                                     'args': [{'local': {'token': TOKEN}, 'session': {}}]})
+        command(writer, Command.GET_ELEMENT_PROPERTY, {'id': 'e1', 'name': 'value'}, f'password {PASSWORD}')
+        writer.close()
+
+        with gzip.open(writer.path, 'rt', encoding='utf-8') as r_file:
+            content = r_file.read()
+        for secret in (PASSWORD, USERNAME, COOKIE, TOKEN):
+            assert secret not in content
+        _, commands = read_trace(writer.path)
+        assert commands[0]['p']['text'] == trace.REDACTED
+        assert commands[2]['p']['cookie'] == {'name': 'AUTH', 'value': trace.REDACTED, 'path': '/'}
+        assert commands[3]['r'] == [{'name': 'AUTH', 'value': trace.REDACTED}]
+        assert commands[4]['r'] == trace.REDACTED and commands[5]['p']['args'] == trace.REDACTED
+        assert commands[6]['r'] == 'password ***'
+
+    def test_other_commands_are_kept(self, writer):
+        script = 'return arguments[0];'
+        command(writer, Command.W3C_EXECUTE_SCRIPT, {'script': script, 'args': ['a']}, 'a')
+        command(writer, Command.SEND_KEYS_TO_ELEMENT, {'id': 'e1', 'text': 'folder1', 'value': list('folder1')})
+        writer.close()
+        _, commands = read_trace(writer.path)
+        assert commands[0]['p'] == {'script': script, 'args': ['a']} and commands[0]['r'] == 'a'
+        assert commands[1]['p']['value'] == list('folder1')
+
+    def test_secret_is_redacted_before_cut(self, writer, monkeypatch):
+        monkeypatch.setattr(trace.Config, 'TRACE_MAX_VALUE', 10)
+        command(writer, Command.GET_PAGE_SOURCE, {}, f'{"x" * 5}{PASSWORD}{"y" * 20}')
+        writer.close()
+        _, commands = read_trace(writer.path)
+        assert commands[0]['r'].startswith('xxxxx***yy')
+
+
+class TestsReadTrace:
+    def test_commands_with_tests(self, writer):
+        command(writer, Command.GET, {'url': 'https://host/login'}, test='tests.py::a')
+        command(writer, Command.GET_TITLE, test='tests.py::b', error='WebDriverException')
+        writer.close()
+        header, commands = read_trace(writer.path)
+        assert header['trace'] == 1 and 'base_url' in header
+        assert [(c['c'], c['test']) for c in commands] == [(Command.GET, 'tests.py::a'),
+                                                          (Command.GET_TITLE, 'tests.py::b')]
+        assert commands[1]['e'] == 'WebDriverException' and 'r' not in commands[1]
+
+    def test_incomplete_line_is_ignored(self, writer):
+        command(writer, Command.GET_TITLE, value='Title')
+        writer.close()
+        with gzip.open(writer.path, 'ab') as a_file:
+            a_file.write(b'{"t":0.1,"d":')
+        _, commands = read_trace(writer.path)
+        assert len(commands) == 1
+
+
+class FakeDriver:
+    """
+    Returns element with new id for find commands, raises for commands of missing elements
+    """
+
+    def __init__(self):
+        self.sent = []
+
+    def execute(self, name, params):
+        self.sent.append((name, params))
+        if name == Command.FIND_ELEMENT:
+            return {'value': WebElement(self, 'replayed-1', w3c=True)}
+        if params.get('id') == 'missing':
+            raise NoSuchElementException('missing')
+        return {'value': None}
+
+
+class TestsReplayer:
+    def test_replay(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(trace.Config, 'BASE_URL', 'https://recorded')
+        replayed = TraceWriter(str(tmp_path / 'trace.jsonl.gz'))
+        command(replayed, Command.NEW_SESSION, {'capabilities': {}})
+        command(replayed, Command.GET, {'url': 'https://recorded/settings/labels'})
+        command(replayed, Command.FIND_ELEMENT, {'using': 'xpath', 'value': '//a'}, element('recorded-1'))
+        command(replayed, Command.CLICK_ELEMENT, {'id': 'recorded-1'})
+        command(replayed, Command.CLICK_ELEMENT, {'id': 'missing'}, error='NoSuchElementException')
+        command(replayed, Command.CLICK_ELEMENT, {'id': 'recorded-2'}, error='StaleElementReferenceException')
+        replayed.close()
+
+        driver = FakeDriver()
+        steps = Replayer(driver, 'http://127.0.0.1:8080').replay(replayed.path)
+        assert driver.sent[:3] == [(Command.GET, {'url': 'http://127.0.0.1:8080/settings/labels'}),
+                                   (Command.FIND_ELEMENT, {'using': 'xpath', 'value': '//a'}),
+                                   (Command.CLICK_ELEMENT, {'id': 'replayed-1'})]
+        assert [step['error'] for step in steps] == [
+            None, None, None, None, 'recorded StaleElementReferenceException, replayed without error']
+        assert all(step['replayed'] is not None for step in steps)
+
+
+class TestsDiff:
+    def test_diff_and_slowdowns(self, tmp_path):
+        paths = []
+        for name, elapsed, last in (('old', 0.1, Command.GET_TITLE), ('new', 0.3, Command.GET_CURRENT_URL)):
+            trace_writer = TraceWriter(str(tmp_path / f'{name}.jsonl.gz'))
+            command(trace_writer, Command.GET, {'url': 'https://host'}, elapsed=elapsed)
+            command(trace_writer, last, elapsed=0.01)
+            trace_writer.close()
+            paths.append(trace_writer.path)
+
+        steps = diff(*paths)
+        assert [(step['recorded'], step['replayed']) for step in steps] == [(0.1, 0.3), (0.01, 0.01)]
+        assert [step['error'] for step in steps] == [None, f'was {Command.GET_TITLE}']
+        assert len(slowdowns(steps, threshold=0.2)) == 1
+        assert slowdowns(steps, threshold=5) == []